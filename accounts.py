@@ -0,0 +1,44 @@
+"""Streaming reader for the accounts CSV.
+
+Accounts are yielded one lightweight record at a time straight from the
+csv module, so exports with millions of rows are processed in bounded
+memory. They are read from a snapshot of the CSV rather than the file
+itself, which the checkpoint store replaces as it compacts its journal;
+Windows refuses to replace a file that is still open.
+"""
+import csv
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+
+from checkpoint import CAREER_LINK_COLUMN, STATUS_COLUMN
+
+AccountRecord = namedtuple(
+    "AccountRecord",
+    ["company", "website", "career_link", "status"],
+)
+
+
+def iter_accounts(csv_path):
+    """Yield an AccountRecord for every row of the accounts CSV with a website."""
+    descriptor, snapshot_path = tempfile.mkstemp(
+        suffix=".snapshot",
+        dir=os.path.dirname(os.path.abspath(csv_path)),
+    )
+    os.close(descriptor)
+    try:
+        shutil.copyfile(csv_path, snapshot_path)
+        with open(snapshot_path, newline="", encoding="utf-8-sig") as csv_file:
+            for row in csv.DictReader(csv_file):
+                website = (row.get("Website") or "").strip()
+                if not website:
+                    continue
+                yield AccountRecord(
+                    row.get("Company") or None,
+                    website,
+                    row.get(CAREER_LINK_COLUMN) or None,
+                    row.get(STATUS_COLUMN) or None,
+                )
+    finally:
+        os.remove(snapshot_path)
@@ -0,0 +1,239 @@
+"""Connectors for job boards hosted by applicant tracking systems.
+
+Greenhouse, Lever, Workable, Ashby and Recruitee boards all publish their
+postings as a public JSON feed. When a career or jobs URL is on one of
+their hosts, every posting of the board is read from that feed in one
+request, and the index and job pages are never rendered. The API base of
+every connector can be overridden, so a local fixture server can stand in
+for the real service. Feed requests take their host slot from the crawl
+frontier, as these hosts are shared by many companies.
+"""
+from contextlib import nullcontext
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from frontier import JOBS_INDEX
+from job_extraction import html_text
+
+HEADERS = {"Accept": "application/json"}
+
+
+def _job(url, title, description):
+    return {
+        "Job URL": url,
+        "Job Title": html_text(title) or None,
+        "Job Description": description,
+    }
+
+
+class AtsConnector:
+    """
+    A hosted job board, recognised from its URLs and read from its feed at
+    `api_base` + `feed_path`, both formatted with the board token.
+    """
+
+    name = None
+    hosts = set()
+    api_base = None
+    feed_path = None
+
+    def __init__(self, session, api_base=None, timeout=10, frontier=None):
+        self.session = session
+        self.timeout = timeout
+        self.frontier = frontier
+        if api_base:
+            self.api_base = api_base.rstrip("/")
+
+    def board_token(self, url):
+        """Return the board token of a URL on this ATS, or None."""
+        parsed = urlparse(url)
+        if parsed.hostname not in self.hosts:
+            return None
+        segments = [segment for segment in parsed.path.split("/") if segment]
+        return segments[0] if segments else None
+
+    def feed_url(self, token):
+        return (self.api_base + self.feed_path).format(token=token)
+
+    def parse(self, data):
+        """Return the jobs of a decoded feed."""
+        raise NotImplementedError
+
+    def fetch_jobs(self, token):
+        """Return every job of the board, or None if its feed is unavailable."""
+        url = self.feed_url(token)
+        if self.frontier is None:
+            slot = nullcontext()
+        else:
+            slot = self.frontier.slot(url, JOBS_INDEX)
+        try:
+            with slot:
+                response = self.session.get(
+                    url,
+                    headers=HEADERS,
+                    timeout=self.timeout,
+                )
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        return [job for job in self.parse(data) if job["Job URL"]]
+
+
+class Greenhouse(AtsConnector):
+    name = "greenhouse"
+    hosts = {"boards.greenhouse.io", "job-boards.greenhouse.io"}
+    api_base = "https://boards-api.greenhouse.io"
+    feed_path = "/v1/boards/{token}/jobs?content=true"
+
+    def board_token(self, url):
+        token = super().board_token(url)
+        if token == "embed":
+            # Embedded boards name the board in the query string
+            return parse_qs(urlparse(url).query).get("for", [None])[0]
+        return token
+
+    def parse(self, data):
+        return [
+            _job(
+                job.get("absolute_url"),
+                job.get("title"),
+                html_text(job.get("content")),
+            )
+            for job in data.get("jobs", [])
+        ]
+
+
+class Lever(AtsConnector):
+    name = "lever"
+    hosts = {"jobs.lever.co"}
+    api_base = "https://api.lever.co"
+    feed_path = "/v0/postings/{token}?mode=json"
+
+    def parse(self, data):
+        jobs = []
+        if not isinstance(data, list):
+            return jobs
+        for posting in data:
+            sections = [posting.get("descriptionPlain") or ""]
+            for section in posting.get("lists", []):
+                sections.append(section.get("text") or "")
+                sections.append(html_text(section.get("content")))
+            sections.append(posting.get("additionalPlain") or "")
+            jobs.append(
+                _job(
+                    posting.get("hostedUrl"),
+                    posting.get("text"),
+                    " ".join(" ".join(sections).split()),
+                )
+            )
+        return jobs
+
+
+class Workable(AtsConnector):
+    name = "workable"
+    hosts = {"apply.workable.com"}
+    api_base = "https://apply.workable.com"
+    feed_path = "/api/v1/widget/accounts/{token}?details=true"
+
+    def board_token(self, url):
+        host = urlparse(url).hostname or ""
+        account, _, domain = host.partition(".")
+        if domain == "workable.com" and account not in ("apply", "www"):
+            # Older boards live on <account>.workable.com
+            return account
+        token = super().board_token(url)
+        # apply.workable.com/j/<shortcode> links a single job, not a board
+        return None if token == "j" else token
+
+    def parse(self, data):
+        return [
+            _job(
+                job.get("url") or job.get("shortlink"),
+                job.get("title"),
+                html_text(job.get("description")),
+            )
+            for job in data.get("jobs", [])
+        ]
+
+
+class Ashby(AtsConnector):
+    name = "ashby"
+    hosts = {"jobs.ashbyhq.com"}
+    api_base = "https://api.ashbyhq.com"
+    feed_path = "/posting-api/job-board/{token}"
+
+    def parse(self, data):
+        return [
+            _job(
+                job.get("jobUrl"),
+                job.get("title"),
+                job.get("descriptionPlain") or html_text(job.get("descriptionHtml")),
+            )
+            for job in data.get("jobs", [])
+            if job.get("isListed", True)
+        ]
+
+
+class Recruitee(AtsConnector):
+    name = "recruitee"
+    api_base = "https://{token}.recruitee.com"
+    feed_path = "/api/offers/"
+
+    def board_token(self, url):
+        host = urlparse(url).hostname or ""
+        company, _, domain = host.partition(".")
+        return company if domain == "recruitee.com" else None
+
+    def parse(self, data):
+        return [
+            _job(
+                offer.get("careers_url"),
+                offer.get("title"),
+                html_text(
+                    (offer.get("description") or "")
+                    + " "
+                    + (offer.get("requirements") or "")
+                ),
+            )
+            for offer in data.get("offers", [])
+        ]
+
+
+CONNECTORS = [Greenhouse, Lever, Workable, Ashby, Recruitee]
+
+
+class AtsConnectors:
+    def __init__(self, session, api_bases=None, timeout=10, frontier=None):
+        """
+        Initialise every connector on the shared session. `api_bases` maps
+        connector names to API bases that replace the public ones.
+        """
+        api_bases = api_bases or {}
+        self.connectors = [
+            connector(session, api_bases.get(connector.name), timeout, frontier)
+            for connector in CONNECTORS
+        ]
+
+    def match(self, url):
+        """Return (connector, board token) for a URL on a known ATS, or Nones."""
+        for connector in self.connectors:
+            token = connector.board_token(url or "")
+            if token:
+                return connector, token
+        return None, None
+
+    def fetch_jobs(self, url):
+        """
+        Return every job of the board `url` is on, or None when the URL is
+        not on a known ATS or its feed is unavailable.
+        """
+        connector, token = self.match(url)
+        if connector is None:
+            return None
+        return connector.fetch_jobs(token)
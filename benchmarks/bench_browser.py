@@ -0,0 +1,85 @@
+"""Benchmark page-load time and browser memory with and without the
+lightweight profile.
+
+Loads every URL with a headless Firefox started with the full profile and
+then with the lightweight one. It reports the time until navigation
+returns, the time until the document is complete, and the resident memory
+of geckodriver and Firefox after the last page. Needs Firefox and
+geckodriver. Run from the repository root, optionally with the URLs to
+load:
+
+    python benchmarks/bench_browser.py [URL ...]
+"""
+import os
+import statistics
+import sys
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver import Firefox
+from selenium.webdriver.support.ui import WebDriverWait
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_profile import (  # noqa: E402
+    DEFAULT_PAGE_LOAD_TIMEOUT,
+    browser_options,
+    driver_rss,
+)
+
+DEFAULT_URLS = [
+    "https://www.python.org/jobs/",
+    "https://www.mozilla.org/en-US/careers/",
+    "https://www.theguardian.com/uk",
+    "https://edition.cnn.com/",
+]
+
+
+def load(driver, url):
+    started = time.perf_counter()
+    try:
+        driver.get(url)
+    except TimeoutException:
+        driver.execute_script("window.stop();")
+    navigated = time.perf_counter() - started
+    try:
+        WebDriverWait(driver, DEFAULT_PAGE_LOAD_TIMEOUT).until(
+            lambda driver: driver.execute_script("return document.readyState")
+            == "complete"
+        )
+    except TimeoutException:
+        pass
+    return navigated, time.perf_counter() - started
+
+
+def run(urls, lightweight, rounds=2):
+    driver = Firefox(options=browser_options(lightweight=lightweight))
+    driver.set_page_load_timeout(DEFAULT_PAGE_LOAD_TIMEOUT)
+    navigations, completions = [], []
+    try:
+        for _ in range(rounds):
+            for url in urls:
+                navigated, completed = load(driver, url)
+                navigations.append(navigated)
+                completions.append(completed)
+        rss = driver_rss(driver)
+    finally:
+        driver.quit()
+    return navigations, completions, rss
+
+
+def main():
+    urls = sys.argv[1:] or DEFAULT_URLS
+    print(f"{'profile':<14}{'navigate':>12}{'complete':>12}{'p95':>10}{'rss':>10}")
+    for name, lightweight in (("full", False), ("lightweight", True)):
+        navigations, completions, rss = run(urls, lightweight)
+        p95 = statistics.quantiles(completions, n=20)[-1]
+        memory = f"{rss / 2**20:.0f}MB" if rss is not None else "n/a"
+        print(
+            f"{name:<14}{statistics.median(navigations):>11.2f}s"
+            f"{statistics.median(completions):>11.2f}s{p95:>9.2f}s{memory:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
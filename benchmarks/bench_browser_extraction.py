@@ -0,0 +1,115 @@
+"""Benchmark extraction in the browser against page_source parsing.
+
+Renders every URL once in a headless Firefox, then times each extraction
+step both ways: transferring `page_source` and parsing it in Python, and
+running the step's script in the browser. Both must find the same thing.
+Needs Firefox and geckodriver. Run from the repository root, optionally
+with the URLs to load:
+
+    python benchmarks/bench_browser_extraction.py [URL ...]
+"""
+import os
+import statistics
+import sys
+import time
+
+from selenium.webdriver import Firefox
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from browser_extraction import BrowserExtractor, NotExtractable  # noqa: E402
+from browser_profile import DEFAULT_PAGE_LOAD_TIMEOUT, browser_options  # noqa: E402
+from html_parsing import default_parser, make_soup  # noqa: E402
+from job_description_n_job_title import heuristic_scrape  # noqa: E402
+from job_extraction import JobExtractor  # noqa: E402
+from keyword_matcher import anchors_from_soup  # noqa: E402
+from utils import StructureIndex, extract_content_from_tag  # noqa: E402
+
+DEFAULT_URLS = [
+    "https://www.python.org/jobs/",
+    "https://www.mozilla.org/en-US/careers/listings/",
+    "https://boards.greenhouse.io/embed/job_board?for=gitlab",
+]
+
+
+def repeated_structure_links(soup):
+    index = StructureIndex(soup)
+    fingerprint = index.most_repeated_fingerprint()
+    if fingerprint is None:
+        return None
+    return extract_content_from_tag(index.matches(fingerprint), "a")
+
+
+def python_steps(parser):
+    job_extractor = JobExtractor()
+    return {
+        "anchors": lambda html: anchors_from_soup(make_soup(html, parser)),
+        "anchors_clean": lambda html: anchors_from_soup(
+            make_soup(html, parser, do_clean=True)
+        ),
+        "repeated_structure": lambda html: repeated_structure_links(
+            make_soup(html, parser)
+        ),
+        "job": lambda html: job_extractor.from_html(html)
+        or heuristic_scrape(make_soup(html, parser, do_clean=True)),
+    }
+
+
+def browser_steps(extractor, driver):
+    job_extractor = JobExtractor()
+    return {
+        "anchors": lambda: extractor.anchors(driver),
+        "anchors_clean": lambda: extractor.anchors(driver, do_clean=True),
+        "repeated_structure": lambda: extractor.repeated_structure_links(driver),
+        "job": lambda: job_extractor.from_fields(
+            extractor.job_fields(driver, do_clean=True)
+        ),
+    }
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main():
+    urls = sys.argv[1:] or DEFAULT_URLS
+    parse = python_steps(default_parser())
+    timings = {step: ([], []) for step in parse}
+    mismatches = []
+
+    driver = Firefox(options=browser_options())
+    driver.set_page_load_timeout(DEFAULT_PAGE_LOAD_TIMEOUT)
+    extract = browser_steps(BrowserExtractor(), driver)
+    try:
+        for url in urls:
+            driver.get(url)
+            for step in parse:
+                expected, python_seconds = timed(
+                    lambda: parse[step](driver.page_source)
+                )
+                try:
+                    found, browser_seconds = timed(extract[step])
+                except NotExtractable:
+                    continue
+                timings[step][0].append(python_seconds)
+                timings[step][1].append(browser_seconds)
+                if found != expected:
+                    mismatches.append((url, step))
+    finally:
+        driver.quit()
+
+    print(f"{'step':<20}{'page_source':>14}{'in browser':>14}")
+    for step, (python_seconds, browser_seconds) in timings.items():
+        if python_seconds:
+            print(
+                f"{step:<20}{statistics.median(python_seconds) * 1000:>12.1f}ms"
+                f"{statistics.median(browser_seconds) * 1000:>12.1f}ms"
+            )
+    for url, step in mismatches:
+        print(f"MISMATCH {step} on {url}")
+
+
+if __name__ == "__main__":
+    main()
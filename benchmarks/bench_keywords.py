@@ -0,0 +1,79 @@
+"""Micro-benchmark link classification on link-heavy pages.
+
+Compares the nested keyword loops the scrapper used before with the
+precompiled LinkScorer, for both the career link and the jobs button
+lookups. Run from the repository root:
+
+    python benchmarks/bench_keywords.py
+"""
+import os
+import random
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import saved_pages  # noqa: E402
+from get_links import keywords_list  # noqa: E402
+from keyword_matcher import HREF, TEXT, LinkScorer, anchors_from_soup  # noqa: E402
+from main import CAREER_URL_KEYWORDS  # noqa: E402
+
+
+def legacy_career_link(anchors):
+    for _, href in anchors:
+        for keyword in CAREER_URL_KEYWORDS:
+            if keyword in (href or ""):
+                return href
+
+
+def legacy_jobs_button(anchors):
+    keywords = [keyword.lower() for keyword in keywords_list]
+    for text, href in anchors:
+        if text.lower() in keywords:
+            return href
+
+
+SECTIONS = [
+    "about", "team", "product", "pricing", "blog", "news", "press",
+    "investors", "customers", "partners", "docs", "support", "legal",
+]
+
+
+def link_heavy_html(links, seed=0):
+    """Return a page of `links` navigation links, none of them job related."""
+    rng = random.Random(seed)
+    anchors = "".join(
+        f'<a href="/{rng.choice(SECTIONS)}/{rng.choice(SECTIONS)}-{i}">'
+        f"{' '.join(rng.choices(SECTIONS, k=rng.randint(1, 4)))}</a>"
+        for i in range(links)
+    )
+    return f"<html><body><nav>{anchors}</nav></body></html>"
+
+
+def main():
+    scorer = LinkScorer(keywords_list, CAREER_URL_KEYWORDS)
+    pages = [(f"generated-{links}", link_heavy_html(links)) for links in (500, 5000)]
+    pages += saved_pages()
+
+    print(f"{'page':<20}{'links':>8}{'lookup':>10}{'legacy':>12}{'scorer':>12}")
+    for name, html in pages:
+        anchors = anchors_from_soup(BeautifulSoup(html, "html.parser"))
+        # Push the only real match to the end, the worst case for both
+        anchors = anchors + [("View All Jobs", "/careers/all")]
+        cases = [
+            ("career", legacy_career_link, lambda: scorer.best(anchors, HREF)),
+            ("button", legacy_jobs_button, lambda: scorer.best(anchors, TEXT)),
+        ]
+        for lookup, legacy, ranked in cases:
+            legacy_time = min(timeit.repeat(lambda: legacy(anchors), number=5)) / 5
+            ranked_time = min(timeit.repeat(ranked, number=5)) / 5
+            print(
+                f"{name:<20}{len(anchors):>8}{lookup:>10}"
+                f"{legacy_time * 1000:>10.2f}ms{ranked_time * 1000:>10.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
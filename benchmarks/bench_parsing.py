@@ -0,0 +1,78 @@
+"""Benchmark parse and clean time and memory per page for each backend.
+
+"legacy" is the html.parser parse followed by the clean-and-reparse the
+scrapper used before; the other rows use html_parsing.make_soup. Memory is
+the tracemalloc peak, which leaves out what lxml and selectolax allocate in
+C. Run from the repository root:
+
+    python benchmarks/bench_parsing.py
+"""
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import job_board_html, job_page_html, saved_pages  # noqa: E402
+from html_parsing import REMOVED_TAGS, available_parsers, make_soup  # noqa: E402
+
+
+def legacy_parse_and_clean(html):
+    soup_obj = BeautifulSoup(html, "html.parser")
+    body_tag = soup_obj.find("body")
+    for tag in REMOVED_TAGS:
+        for element in soup_obj.find_all(tag):
+            element.decompose()
+    for tag in soup_obj.find_all(True):
+        tag.attrs = {
+            key: value
+            for key, value in tag.attrs.items()
+            if key in ["id", "class", "href"]
+        }
+    cleaned_html = re.sub(r"\s+", " ", str(body_tag))
+    return BeautifulSoup(cleaned_html, "html.parser")
+
+
+def measure(function, html, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(html)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    function(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    pages = [
+        ("job-board", job_board_html(1000)),
+        ("job-page", job_page_html(200)),
+    ]
+    pages += saved_pages()
+
+    backends = [("legacy", legacy_parse_and_clean)]
+    for parser in available_parsers():
+        backends.append(
+            (parser, lambda html, parser=parser: make_soup(html, parser, True))
+        )
+
+    print(f"{'page':<20}{'backend':<14}{'time':>10}{'peak memory':>14}")
+    for name, html in pages:
+        for backend, function in backends:
+            seconds, peak = measure(function, html)
+            print(
+                f"{name:<20}{backend:<14}{seconds * 1000:>8.1f}ms"
+                f"{peak / 2**20:>11.1f}MiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark repeated-structure detection on large job boards.
+
+Compares the recursive per-div pattern building the scrapper used before
+with the single-pass StructureIndex. Run from the repository root:
+
+    python benchmarks/bench_structure.py
+"""
+import os
+import sys
+import time
+from collections import Counter
+
+from bs4 import BeautifulSoup, Tag
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import job_board_html, saved_pages  # noqa: E402
+from utils import StructureIndex, extract_content_from_tag  # noqa: E402
+
+
+def legacy_tag_pattern(element):
+    if isinstance(element, Tag):
+        return [element.name] + sum(
+            [legacy_tag_pattern(child) for child in element.children], []
+        )
+    return []
+
+
+def legacy_job_links(soup):
+    counts = Counter()
+    for div in soup.find_all("div"):
+        if div.find("a"):
+            counts[tuple(legacy_tag_pattern(div))] += 1
+    if not counts:
+        return None
+    target = list(max(counts, key=counts.get))
+    matches = [div for div in soup.find_all("div") if legacy_tag_pattern(div) == target]
+    return extract_content_from_tag(matches, "a")
+
+
+def indexed_job_links(soup):
+    index = StructureIndex(soup)
+    fingerprint = index.most_repeated_fingerprint()
+    if fingerprint is None:
+        return None
+    return extract_content_from_tag(index.matches(fingerprint), "a")
+
+
+def timed(function, soup, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(soup)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    pages = [(f"generated-{jobs}", job_board_html(jobs)) for jobs in (200, 1000, 4000)]
+    pages += saved_pages()
+    print(f"{'page':<24}{'legacy':>10}{'indexed':>10}{'speedup':>10}")
+    for name, html in pages:
+        soup = BeautifulSoup(html, "html.parser")
+        legacy_time, legacy_links = timed(legacy_job_links, soup)
+        indexed_time, indexed_links = timed(indexed_job_links, soup)
+        assert legacy_links == indexed_links, name
+        print(
+            f"{name:<24}{legacy_time:>9.3f}s{indexed_time:>9.3f}s"
+            f"{legacy_time / indexed_time:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark job title and description extraction on large job pages.
+
+Compares the per-tag find_all scan the scrapper used before with the
+single-pass score_text_blocks, and checks both pick the same title and
+description block. Run from the repository root:
+
+    python benchmarks/bench_text_blocks.py
+"""
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import job_board_html, job_page_html, saved_pages  # noqa: E402
+from job_description_n_job_title import (  # noqa: E402
+    DESCRIPTION_TAGS,
+    find_largest_text_block,
+    heuristic_scrape,
+)
+
+# Pages where word boundaries, skipped string types and ties matter
+EDGE_CASES = [
+    ("adjacent-inline", "<div><span>foo</span><span>bar</span> baz</div>"),
+    ("spaced-inline", "<div><span>foo </span><span>bar</span></div><p>a b</p>"),
+    ("script-style", "<div>a<script>x y z w</script>b<style>p q r</style></div>"),
+    ("comment", "<div>one<!-- two three four -->two</div><p>one two</p>"),
+    ("cdata", "<div><p>a b</p><![CDATA[c d e]]></div>"),
+    ("tie-tag-order", "<span>a b c</span><p>d e f</p><div>g h i</div>"),
+    ("tie-document", "<section><p>a b</p></section><p>c d</p>"),
+    ("empty", "<div></div><p> </p><h2></h2>"),
+    ("no-title", "<div><p>only text here</p></div>"),
+    ("title-order", "<h3>Three</h3><h2>Two</h2><div><h2>Nested</h2>text</div>"),
+    ("unicode-space", "<div>a\u00a0b\u2003c</div><p>a\u00a0</p><p>b</p>"),
+]
+
+
+def legacy_find_largest_text_block(soup, tags):
+    largest_block = ""
+    largest_block_text = ""
+
+    for tag in tags:
+        elements = soup.find_all(tag)
+        for element in elements:
+            text = element.text.strip()
+            if len(text.split()) > len(largest_block_text.split()):
+                largest_block = element
+                largest_block_text = text
+
+    return largest_block
+
+
+def legacy_heuristic_scrape(soup):
+    for tag in ["h1", "h2", "h3"]:
+        job_title = soup.find(tag)
+        if job_title:
+            job_title = job_title.text.strip()
+            break
+
+    largest_text_block = legacy_find_largest_text_block(soup, ["div", "p", "span"])
+
+    if largest_text_block:
+        job_description = largest_text_block.text.strip()
+        return {"Job Title": job_title, "Job Description": job_description}
+
+
+def timed(function, soup, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(soup)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    for name, html in EDGE_CASES:
+        soup = BeautifulSoup(html, "html.parser")
+        assert legacy_heuristic_scrape(soup) == heuristic_scrape(soup), name
+        assert legacy_find_largest_text_block(
+            soup, DESCRIPTION_TAGS
+        ) is find_largest_text_block(soup, DESCRIPTION_TAGS), name
+
+    pages = [(f"job-{count}", job_page_html(count)) for count in (40, 400)]
+    pages += [(f"board-{jobs}", job_board_html(jobs)) for jobs in (200, 1000)]
+    pages += saved_pages()
+    print(f"{'page':<24}{'legacy':>10}{'single':>10}{'speedup':>10}")
+    for name, html in pages:
+        soup = BeautifulSoup(html, "html.parser")
+        legacy_time, legacy_result = timed(legacy_heuristic_scrape, soup)
+        single_time, single_result = timed(heuristic_scrape, soup)
+        assert legacy_result == single_result, name
+        print(
+            f"{name:<24}{legacy_time:>9.3f}s{single_time:>9.3f}s"
+            f"{legacy_time / single_time:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Synthetic pages shaped like the ones the scrapper visits.
+
+Saved pages can be dropped into benchmarks/pages/ as .html files; the
+benchmarks use them in addition to the generated ones.
+"""
+import os
+import random
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+
+WORDS = (
+    "we are looking for an experienced engineer to join our growing team "
+    "you will work closely with product design and data to build reliable "
+    "services for our customers across europe and north america"
+).split()
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _chrome(rng):
+    nav = "".join(
+        f'<li><a href="/section-{i}">{_sentence(rng, 2)}</a></li>' for i in range(30)
+    )
+    header = f"<header><nav><ul>{nav}</ul></nav></header>"
+    footer = f"<footer><div><ul>{nav}</ul></div></footer>"
+    scripts = "".join(
+        f"<script>window.track{i} = function () {{ return {i}; }};</script>"
+        for i in range(20)
+    )
+    return header, footer, scripts
+
+
+def job_board_html(jobs=2000, seed=0):
+    """Return a jobs index page with `jobs` repeated job cards."""
+    rng = random.Random(seed)
+    header, footer, scripts = _chrome(rng)
+    cards = "".join(
+        f'<div class="job-card"><div class="job-head">'
+        f'<a href="/jobs/{i}?utm_source=board">{_sentence(rng, 4)}</a>'
+        f"<span>{_sentence(rng, 2)}</span></div>"
+        f'<div class="job-meta"><p>{_sentence(rng, 12)}</p>'
+        f'<svg><path d="M0 0"></path></svg></div></div>'
+        for i in range(jobs)
+    )
+    return (
+        "<html><head><title>Careers</title></head><body>"
+        f'{header}<main><div class="jobs"><div class="list">{cards}</div>'
+        f"</div></main>{footer}{scripts}</body></html>"
+    )
+
+
+def job_page_html(paragraphs=40, seed=0):
+    """Return a job detail page with a long description."""
+    rng = random.Random(seed)
+    header, footer, scripts = _chrome(rng)
+    body = "".join(
+        f"<div><p>{_sentence(rng, 40)}</p><span>{_sentence(rng, 5)}</span></div>"
+        for _ in range(paragraphs)
+    )
+    return (
+        "<html><head><title>Engineer</title></head><body>"
+        f'{header}<main><h1>Senior Engineer</h1><div class="description">'
+        f"{body}</div></main>{footer}{scripts}</body></html>"
+    )
+
+
+def saved_pages():
+    """Return (name, html) for every saved page in benchmarks/pages/."""
+    if not os.path.isdir(PAGES_DIR):
+        return []
+    pages = []
+    for name in sorted(os.listdir(PAGES_DIR)):
+        if name.endswith(".html"):
+            with open(os.path.join(PAGES_DIR, name), encoding="utf-8") as page:
+                pages.append((name, page.read()))
+    return pages
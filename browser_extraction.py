@@ -0,0 +1,395 @@
+"""Extraction inside the browser.
+
+Reading `page_source` sends the whole serialised DOM over the WebDriver
+connection, and the scrapper then parses it again in Python only to keep a
+few links or one block of text. These scripts compute the same answers as
+the Python extractors where the DOM already lives and return just that:
+the links of a page with their texts, the links of the most repeated
+structure on a jobs index, or the title, main text block and structured
+data of a job page. When a script fails, or a page needs what only the
+Python side reads (microdata), NotExtractable tells the caller to fall back
+to `page_source`.
+"""
+import threading
+import time
+
+from selenium.common.exceptions import JavascriptException
+
+from html_parsing import REMOVED_TAGS
+from job_description_n_job_title import DESCRIPTION_TAGS, TITLE_TAGS
+
+ANCHORS = "anchors"
+REPEATED_STRUCTURE = "repeated_structure"
+JOB_FIELDS = "job_fields"
+STEPS = [ANCHORS, REPEATED_STRUCTURE, JOB_FIELDS]
+
+# Every script gets the tags cleaning removes and whether to clean first.
+# Cleaning is mirrored without touching the page: removed subtrees are
+# skipped and whitespace is collapsed in each text node.
+_PRELUDE = """
+const removedTags = new Set(arguments[0]);
+const clean = arguments[1];
+// The text of these tags is not page text
+const rawTextTags = new Set(["script", "style", "template"]);
+
+function nameOf(node) {
+    return node.nodeName.toLowerCase();
+}
+
+function rootElement() {
+    return clean
+        ? document.body || document.documentElement
+        : document.documentElement;
+}
+
+function isRemoved(element, root) {
+    if (!clean) {
+        return false;
+    }
+    for (let node = element; node && node !== root; node = node.parentElement) {
+        if (removedTags.has(nameOf(node))) {
+            return true;
+        }
+    }
+    return false;
+}
+
+function pageText(text) {
+    return clean ? text.replace(/\\s+/g, " ") : text;
+}
+
+function textOf(element, separator) {
+    const parts = [];
+    const stack = [element];
+    while (stack.length) {
+        const node = stack.pop();
+        if (node.nodeType === Node.TEXT_NODE
+            || node.nodeType === Node.CDATA_SECTION_NODE) {
+            if (node.data) {
+                parts.push(pageText(node.data));
+            }
+            continue;
+        }
+        if (node.nodeType !== Node.ELEMENT_NODE) {
+            continue;
+        }
+        const name = nameOf(node);
+        if ((clean && removedTags.has(name)) || rawTextTags.has(name)) {
+            continue;
+        }
+        for (let i = node.childNodes.length - 1; i >= 0; i--) {
+            stack.push(node.childNodes[i]);
+        }
+    }
+    return parts.join(separator);
+}
+"""
+
+# [text, href] of every link, like `anchors_from_soup`
+ANCHORS_SCRIPT = _PRELUDE + """
+const root = rootElement();
+const anchors = [];
+for (const anchor of root.getElementsByTagName("a")) {
+    if (!isRemoved(anchor, root)) {
+        anchors.push([textOf(anchor, " "), anchor.getAttribute("href")]);
+    }
+}
+return anchors;
+"""
+
+# The hrefs of the links in the divs of the most repeated structure, like
+# `get_job_links_from_indexing_page`. Structures are the same polynomial
+# hashes of the pre-order tag names as `StructureIndex`, computed modulo
+# two primes small enough for exact float arithmetic.
+REPEATED_STRUCTURE_SCRIPT = _PRELUDE + """
+const moduli = [67108859, 33554393];
+const base = 1000003;
+const powers = [[1], [1]];
+function power(which, exponent) {
+    const table = powers[which];
+    while (table.length <= exponent) {
+        table.push(table[table.length - 1] * base % moduli[which]);
+    }
+    return table[exponent];
+}
+const nameIds = new Map();
+function nameId(name) {
+    if (!nameIds.has(name)) {
+        nameIds.set(name, nameIds.size + 1);
+    }
+    return nameIds.get(name);
+}
+
+const root = rootElement();
+const fingerprints = new Map();
+const containsAnchor = new Map();
+const divs = [];
+const stack = [[root, false]];
+while (stack.length) {
+    const [element, childrenDone] = stack.pop();
+    const children = Array.from(element.children).filter(
+        (child) => !(clean && removedTags.has(nameOf(child)))
+    );
+    if (!childrenDone) {
+        if (nameOf(element) === "div") {
+            divs.push(element);
+        }
+        stack.push([element, true]);
+        for (let i = children.length - 1; i >= 0; i--) {
+            stack.push([children[i], false]);
+        }
+        continue;
+    }
+    const id = nameId(nameOf(element));
+    const fingerprint = [id, id, 1];
+    let anchor = false;
+    for (const child of children) {
+        const other = fingerprints.get(child);
+        for (const which of [0, 1]) {
+            fingerprint[which] = (
+                fingerprint[which] * power(which, other[2]) + other[which]
+            ) % moduli[which];
+        }
+        fingerprint[2] += other[2];
+        anchor = anchor || nameOf(child) === "a" || containsAnchor.get(child);
+    }
+    fingerprints.set(element, fingerprint);
+    containsAnchor.set(element, anchor);
+}
+
+const groups = new Map();
+for (const div of divs) {
+    const key = fingerprints.get(div).join(":");
+    if (!groups.has(key)) {
+        groups.set(key, {count: 0, divs: []});
+    }
+    const group = groups.get(key);
+    group.divs.push(div);
+    group.count += containsAnchor.get(div) ? 1 : 0;
+}
+let best = null;
+for (const group of groups.values()) {
+    if (group.count && (best === null || group.count > best.count)) {
+        best = group;
+    }
+}
+if (best === null) {
+    return null;
+}
+const hrefs = [];
+for (const div of best.divs) {
+    for (const anchor of div.getElementsByTagName("a")) {
+        if (!isRemoved(anchor, root)) {
+            hrefs.push(anchor.getAttribute("href"));
+        }
+    }
+}
+return hrefs;
+"""
+
+# The title, the largest text block and the structured data of a job page,
+# like `score_text_blocks` and `heuristic_scrape`. The OpenGraph tags and
+# JSON-LD scripts come back as a small document `JobExtractor.from_html`
+# reads; pages with microdata are left to the Python side.
+JOB_FIELDS_SCRIPT = _PRELUDE + """
+const blockRanks = new Map(arguments[2].map((name, rank) => [name, rank]));
+const titleTags = arguments[3];
+if (document.querySelector('[itemtype*="schema.org/JobPosting" i]')) {
+    return {microdata: true};
+}
+
+function stringWords(text) {
+    return [
+        text.split(/\\s+/).filter(Boolean).length,
+        !/^\\s/.test(text),
+        !/\\s$/.test(text),
+    ];
+}
+function joinWords(left, right) {
+    if (left === null) {
+        return right;
+    }
+    if (right === null) {
+        return left;
+    }
+    return [left[0] + right[0] - (left[2] && right[1] ? 1 : 0), left[1], right[2]];
+}
+
+const root = rootElement();
+const titles = new Map();
+const wordsByElement = new Map();
+let best = null;
+let bestKey = null;
+let position = 0;
+const stack = [[root, null]];
+while (stack.length) {
+    const [element, elementPosition] = stack.pop();
+    const name = nameOf(element);
+    if (elementPosition === null) {
+        stack.push([element, position]);
+        if (element !== root && titleTags.includes(name) && !titles.has(name)) {
+            titles.set(name, element);
+        }
+        position += 1;
+        for (let i = element.children.length - 1; i >= 0; i--) {
+            const child = element.children[i];
+            if (!(clean && removedTags.has(nameOf(child)))) {
+                stack.push([child, null]);
+            }
+        }
+        continue;
+    }
+
+    let words = null;
+    if (!rawTextTags.has(name)) {
+        for (const child of element.childNodes) {
+            if (child.nodeType === Node.ELEMENT_NODE) {
+                if (wordsByElement.has(child)) {
+                    words = joinWords(words, wordsByElement.get(child));
+                    wordsByElement.delete(child);
+                }
+            } else if ((child.nodeType === Node.TEXT_NODE
+                        || child.nodeType === Node.CDATA_SECTION_NODE)
+                       && child.data) {
+                words = joinWords(words, stringWords(child.data));
+            }
+        }
+    }
+    wordsByElement.set(element, words);
+
+    if (element !== root && blockRanks.has(name) && words !== null && words[0]) {
+        const key = [-words[0], blockRanks.get(name), elementPosition];
+        const better = bestKey === null
+            || key[0] < bestKey[0]
+            || (key[0] === bestKey[0] && (key[1] < bestKey[1]
+                || (key[1] === bestKey[1] && key[2] < bestKey[2])));
+        if (better) {
+            best = element;
+            bestKey = key;
+        }
+    }
+}
+
+let title = null;
+for (const name of titleTags) {
+    if (titles.has(name)) {
+        title = textOf(titles.get(name), "").trim();
+        break;
+    }
+}
+
+const metas = [];
+if (document.head) {
+    for (const meta of document.head.getElementsByTagName("meta")) {
+        const key = meta.getAttribute("property") || meta.getAttribute("name") || "";
+        if (/^og:/i.test(key)) {
+            metas.push(meta.outerHTML);
+        }
+    }
+}
+const scripts = Array.from(
+    document.querySelectorAll('script[type^="application/ld+json" i]'),
+    (script) => script.outerHTML
+);
+return {
+    microdata: false,
+    title: title,
+    description: best === null ? null : textOf(best, "").trim(),
+    structured_html: metas.join("") + "</head>" + scripts.join(""),
+};
+"""
+
+
+class NotExtractable(Exception):
+    """The rendered page has to be read from `page_source` instead."""
+
+
+class BrowserExtractor:
+    def __init__(self, removed_tags=REMOVED_TAGS):
+        """
+        Initialise the extractor. `removed_tags` are the tags cleaning
+        removes, mirrored when a step is run with `do_clean`.
+        """
+        self.removed_tags = list(removed_tags)
+        self.stats = {
+            step: {"runs": 0, "fallbacks": 0, "seconds": 0.0} for step in STEPS
+        }
+        self._lock = threading.Lock()
+
+    def _record(self, step, started, fell_back):
+        with self._lock:
+            stats = self.stats[step]
+            stats["runs"] += 1
+            stats["fallbacks"] += fell_back
+            stats["seconds"] += time.perf_counter() - started
+
+    def _run(self, step, driver, script, do_clean, *args):
+        started = time.perf_counter()
+        try:
+            result = driver.execute_script(
+                script, self.removed_tags, do_clean, *args
+            )
+        except JavascriptException as e:
+            self._record(step, started, True)
+            raise NotExtractable(f"{step} script failed: {e.msg}") from e
+        self._record(step, started, False)
+        return result
+
+    def anchors(self, driver, do_clean=False):
+        """Return (text, href) for every link of the rendered page."""
+        return [
+            (text, href)
+            for text, href in self._run(ANCHORS, driver, ANCHORS_SCRIPT, do_clean)
+        ]
+
+    def repeated_structure_links(self, driver, do_clean=False):
+        """
+        Return the hrefs of the links in the most repeated structure of the
+        rendered page, or None when no repeated structure has links.
+        """
+        return self._run(
+            REPEATED_STRUCTURE,
+            driver,
+            REPEATED_STRUCTURE_SCRIPT,
+            do_clean,
+        )
+
+    def job_fields(self, driver, do_clean=False):
+        """
+        Return the title, description and `structured_html` of the rendered
+        job page. Raise NotExtractable when the page has microdata.
+        """
+        fields = self._run(
+            JOB_FIELDS,
+            driver,
+            JOB_FIELDS_SCRIPT,
+            do_clean,
+            DESCRIPTION_TAGS,
+            TITLE_TAGS,
+        )
+        if fields["microdata"]:
+            with self._lock:
+                self.stats[JOB_FIELDS]["fallbacks"] += 1
+            raise NotExtractable("the page has microdata")
+        return fields
+
+    def report(self):
+        """Return how often each step ran, fell back and its mean time."""
+        with self._lock:
+            stats = {step: dict(entry) for step, entry in self.stats.items()}
+        report = {}
+        for step, entry in stats.items():
+            if not entry["runs"]:
+                continue
+            entry["mean_ms"] = entry["seconds"] / entry["runs"] * 1000
+            report[step] = entry
+        return report
+
+    def print_report(self):
+        """Print the in-browser extraction report."""
+        for step, entry in self.report().items():
+            print(
+                f"in-browser {step}: {entry['runs']} runs, "
+                f"{entry['fallbacks']} fell back to page_source, "
+                f"{entry['mean_ms']:.1f}ms on average"
+            )
@@ -0,0 +1,240 @@
+"""Lightweight Firefox profile for scraping.
+
+The scrapper only reads the DOM of the pages it renders, so the profile
+stops Firefox from fetching what the cleaning step throws away anyway:
+images, media, web fonts, and the ad and analytics hosts that are blocked
+by tracking protection or, for the ones it misses, by a PAC script routing
+them to a dead proxy. Navigation returns once the DOM is ready, under a
+page-load timeout.
+"""
+import os
+import signal
+import subprocess
+from urllib.parse import quote
+
+from selenium.webdriver import FirefoxOptions
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Seconds a navigation may take before loading is stopped
+DEFAULT_PAGE_LOAD_TIMEOUT = 30
+
+# Ad, analytics and session recording hosts, blocked with their subdomains
+BLOCKED_HOSTS = [
+    "2mdn.net",
+    "adnxs.com",
+    "ads-twitter.com",
+    "adservice.google.com",
+    "amazon-adsystem.com",
+    "analytics.tiktok.com",
+    "bat.bing.com",
+    "clarity.ms",
+    "criteo.com",
+    "doubleclick.net",
+    "facebook.net",
+    "fullstory.com",
+    "google-analytics.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "googletagmanager.com",
+    "hotjar.com",
+    "hs-analytics.net",
+    "mixpanel.com",
+    "nr-data.net",
+    "outbrain.com",
+    "px.ads.linkedin.com",
+    "quantserve.com",
+    "scorecardresearch.com",
+    "segment.io",
+    "snap.licdn.com",
+    "taboola.com",
+]
+
+# Nothing listens on the discard port, so blocked requests fail at once
+DEAD_PROXY = "PROXY 127.0.0.1:9"
+
+LIGHTWEIGHT_PREFS = {
+    # Images, fonts and media
+    "permissions.default.image": 2,
+    "gfx.downloadable_fonts.enabled": False,
+    "browser.display.use_document_fonts": 0,
+    "media.autoplay.default": 5,
+    "media.preload.default": 0,
+    "media.preload.auto": 0,
+    "media.volume_scale": "0.0",
+    # Trackers
+    "privacy.trackingprotection.enabled": True,
+    "privacy.trackingprotection.socialtracking.enabled": True,
+    "privacy.trackingprotection.cryptomining.enabled": True,
+    "privacy.trackingprotection.fingerprinting.enabled": True,
+    # Speculative and background traffic
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+    "browser.safebrowsing.malware.enabled": False,
+    "browser.safebrowsing.phishing.enabled": False,
+    "datareporting.healthreport.uploadEnabled": False,
+    "toolkit.telemetry.enabled": False,
+    "app.update.auto": False,
+    # Prompts a headless scrapper can never answer
+    "dom.webnotifications.enabled": False,
+    "geo.enabled": False,
+}
+
+
+def blocklist_pac(hosts):
+    """Return a PAC script sending `hosts` to a dead proxy."""
+    conditions = " || ".join(
+        f'host == "{host}" || dnsDomainIs(host, ".{host}")' for host in hosts
+    )
+    return (
+        "function FindProxyForURL(url, host) {"
+        f" if ({conditions}) return {DEAD_PROXY!r};"
+        ' return "DIRECT"; }'
+    )
+
+
+def browser_options(headless=True, lightweight=True, blocked_hosts=BLOCKED_HOSTS):
+    """
+    Return the Firefox options of the scrapper. With `lightweight` the
+    profile skips images, media, fonts and `blocked_hosts`, and navigation
+    returns as soon as the DOM is ready.
+    """
+    options = FirefoxOptions()
+    if headless:
+        options.add_argument("--headless")
+    options.add_argument("--width=1920")
+    options.add_argument("--height=1080")
+    # Firefox counterpart of Chrome's AutomationControlled flag
+    options.set_preference("dom.webdriver.enabled", False)
+    if not lightweight:
+        return options
+
+    options.page_load_strategy = "eager"
+    for name, value in LIGHTWEIGHT_PREFS.items():
+        options.set_preference(name, value)
+    if blocked_hosts:
+        options.set_preference("network.proxy.type", 2)
+        options.set_preference(
+            "network.proxy.autoconfig_url",
+            "data:application/x-ns-proxy-autoconfig,"
+            + quote(blocklist_pac(blocked_hosts)),
+        )
+    return options
+
+
+def _proc_children():
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat_file:
+                stat = stat_file.read()
+        except OSError:
+            continue
+        # The parent pid follows the state, after the parenthesised name
+        parent = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(parent, []).append(int(entry))
+    return children
+
+
+def _proc_rss(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as statm_file:
+            pages = int(statm_file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def can_measure_memory():
+    """Return whether `process_tree_rss` works on this system."""
+    return psutil is not None or os.path.isdir("/proc")
+
+
+def process_tree_rss(pid):
+    """
+    Return the resident memory, in bytes, of a process and all of its
+    descendants, or None when it cannot be measured on this system.
+    """
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+
+    if not os.path.isdir("/proc"):
+        return None
+    children = _proc_children()
+    total = 0
+    pending = [pid]
+    while pending:
+        pid = pending.pop()
+        total += _proc_rss(pid)
+        pending += children.get(pid, [])
+    return total
+
+
+def kill_process_tree(pid):
+    """Kill a process and all of its descendants."""
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            processes = process.children(recursive=True) + [process]
+        except psutil.Error:
+            return
+        for process in processes:
+            try:
+                process.kill()
+            except psutil.Error:
+                continue
+        return
+
+    if os.name == "nt":
+        # Without /proc the children can only be found by taskkill itself
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(pid)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        return
+
+    pids = [pid]
+    if os.path.isdir("/proc"):
+        children = _proc_children()
+        pending = [pid]
+        while pending:
+            descendants = children.get(pending.pop(), [])
+            pids += descendants
+            pending += descendants
+    for pid in reversed(pids):
+        try:
+            os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+        except OSError:
+            continue
+
+
+def driver_pid(driver):
+    """Return the pid of a driver's geckodriver process, or None."""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+
+def driver_rss(driver):
+    """Return the resident memory of a driver and its browser, or None."""
+    pid = driver_pid(driver)
+    return None if pid is None else process_tree_rss(pid)
@@ -0,0 +1,297 @@
+"""Concurrent career-page discovery.
+
+Every candidate career URL for a domain (career subdomains, common career
+paths and the sitemaps listed in robots.txt or at the usual locations) is
+probed at once on a shared thread pool. The first candidate in priority
+order that answers wins, and the remaining probes are cancelled as soon as
+the answer is settled.
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import NamedTuple
+from urllib.parse import urlparse
+
+import requests
+
+from frontier import PROBE, Frontier
+from http_cache import build_session
+from instrumentation import discovery_stage
+from negative_cache import DNS, classify_exception, classify_status
+from sitemap import find_in_sitemap, read_robots_sitemaps
+
+HEADERS = {
+    "User-Agent": "Googlebot/2.1 (+http://www.google.com/bot.html)",
+}
+
+# Candidates are listed in priority order: subdomains, then paths, then sitemaps
+CAREER_SUBDOMAINS = [
+    "careers",
+    "recruitment",
+    "jobs",
+    "employment",
+    "opportunities",
+    "vacancies",
+    "hiring",
+    "join",
+    "work",
+    "jobboard",
+]
+
+CAREER_PATHS = [
+    "/careers",
+    "/jobs",
+    "/career",
+    "/employment",
+    "/opportunities",
+    "/join-us",
+    "/work-with-us",
+    "/vacancies",
+    "/job-openings",
+    "/recruitment",
+    "/hiring",
+    "/work-for-us",
+    "/job-listings",
+    "/career-opportunities",
+    "/job-search",
+]
+
+SITEMAP_PATHS = [
+    "/sitemap.xml",
+    "/sitemap_index.xml",
+]
+
+SITEMAP_KEYWORDS = [
+    "career",
+    "job",
+    "employment",
+    "opportunity",
+]
+
+
+class Probe(NamedTuple):
+    priority: int
+    kind: str  # "subdomain", "path", "robots" or "sitemap"
+    url: str
+
+
+def build_probes(domain):
+    """Return every candidate career URL for the domain, in priority order."""
+    parsed_url = urlparse(domain)
+    scheme = parsed_url.scheme or "https"
+    host = parsed_url.netloc
+    # careers.example.com rather than careers.www.example.com
+    bare_host = host[4:] if host.startswith("www.") else host
+
+    candidates = [
+        ("subdomain", f"https://{subdomain}.{bare_host}")
+        for subdomain in CAREER_SUBDOMAINS
+    ]
+    candidates += [("path", f"{scheme}://{host}{path}") for path in CAREER_PATHS]
+    # Sitemaps listed in robots.txt come before the conventional locations
+    candidates += [("robots", f"{scheme}://{host}/robots.txt")]
+    candidates += [
+        ("sitemap", f"{scheme}://{host}{path}") for path in SITEMAP_PATHS
+    ]
+    return [
+        Probe(priority, kind, url)
+        for priority, (kind, url) in enumerate(candidates)
+    ]
+
+
+class CareerPageDiscovery:
+    def __init__(
+        self,
+        max_workers=32,
+        per_host_limit=4,
+        timeout=10,
+        headers=None,
+        session=None,
+        negative_cache=None,
+        resolver=None,
+        frontier=None,
+        instrumentation=None,
+    ):
+        """
+        Initialise the discovery engine.
+
+        `max_workers` caps the number of probes in flight overall. Probes
+        take their host slot from `frontier`, or, without one, from a
+        frontier allowing `per_host_limit` probes in flight per host.
+        Candidates recorded in `negative_cache` are not probed, and with a
+        `resolver` only candidate subdomains that resolve are probed.
+        Probe times are recorded per probe kind in `instrumentation`.
+        """
+        self.timeout = timeout
+        self.frontier = frontier or Frontier(
+            per_host_limit=per_host_limit,
+            min_delay=0,
+        )
+        self.headers = headers or HEADERS
+        self.session = session or build_session(pool_size=max_workers)
+        self.negative_cache = negative_cache
+        self.resolver = resolver
+        self.instrumentation = instrumentation
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="career-probe",
+        )
+
+    def _get(self, url, stream=False):
+        try:
+            response = self.session.get(
+                url,
+                headers=self.headers,
+                timeout=self.timeout,
+                stream=stream,
+            )
+        except requests.RequestException as e:
+            self._record_failure(url, classify_exception(e))
+            return None
+        if response.status_code == 200:
+            return response
+        response.close()
+        self._record_failure(url, classify_status(response.status_code))
+        return None
+
+    def _record_failure(self, url, failure):
+        if self.negative_cache is not None and failure is not None:
+            self.negative_cache.record(url, failure)
+
+    def _is_known_dead(self, url):
+        return (
+            self.negative_cache is not None
+            and self.negative_cache.failure(url) is not None
+        )
+
+    def _probe_page(self, url):
+        if self._get(url) is not None:
+            return url
+
+    def _probe_sitemap(self, url, cancelled):
+        response = self._get(url, stream=True)
+        if response is None:
+            return None
+        return find_in_sitemap(
+            self.session,
+            response,
+            SITEMAP_KEYWORDS,
+            headers=self.headers,
+            timeout=self.timeout,
+            should_stop=cancelled.is_set,
+        )
+
+    def _probe_robots(self, url, cancelled):
+        response = self._get(url)
+        if response is None:
+            return None
+        origin = url[: -len("/robots.txt")]
+        conventional = {f"{origin}{path}" for path in SITEMAP_PATHS}
+        for sitemap_url in read_robots_sitemaps(response.text):
+            # The conventional locations have probes of their own
+            if sitemap_url in conventional or cancelled.is_set():
+                continue
+            career_link = self._probe_sitemap(sitemap_url, cancelled)
+            if career_link:
+                return career_link
+        return None
+
+    def _run_probe(self, probe, cancelled, company=None):
+        if cancelled.is_set():
+            return None
+        with self.frontier.slot(probe.url, PROBE, cancelled.is_set) as granted:
+            if not granted:
+                return None
+            started = time.perf_counter()
+            try:
+                if probe.kind == "sitemap":
+                    return self._probe_sitemap(probe.url, cancelled)
+                if probe.kind == "robots":
+                    return self._probe_robots(probe.url, cancelled)
+                return self._probe_page(probe.url)
+            except Exception as e:
+                print(e)
+                return None
+            finally:
+                if self.instrumentation is not None:
+                    self.instrumentation.record(
+                        discovery_stage(probe.kind),
+                        time.perf_counter() - started,
+                        url=probe.url,
+                        company=company,
+                    )
+
+    def prefetch(self, domains):
+        """
+        Resolve the candidate subdomains of a batch of domains at once.
+        Hosts that do not resolve are recorded as dead.
+        """
+        if self.resolver is None:
+            return
+        urls = {}
+        for domain in domains:
+            for probe in build_probes(domain):
+                if probe.kind == "subdomain" and not self._is_known_dead(probe.url):
+                    urls.setdefault(urlparse(probe.url).hostname, probe.url)
+
+        answers = self.resolver.resolve_many(urls)
+        for host, resolves in answers.items():
+            if not resolves:
+                self._record_failure(urls[host], DNS)
+
+    def _resolves(self, probe):
+        if self.resolver is None or probe.kind != "subdomain":
+            return True
+        return self.resolver.resolves(urlparse(probe.url).hostname) is not False
+
+    def discover(self, domain):
+        """
+        Probe all candidates for the domain concurrently and return the
+        highest priority hit, or None if no candidate answered.
+        """
+        self.prefetch([domain])
+        probes = [
+            probe
+            for probe in build_probes(domain)
+            if self._resolves(probe) and not self._is_known_dead(probe.url)
+        ]
+        cancelled = threading.Event()
+        # Probe threads do not know the company the caller is processing
+        company = (
+            self.instrumentation.current_company()
+            if self.instrumentation is not None
+            else None
+        )
+        futures = {
+            self._executor.submit(
+                self._run_probe, probe, cancelled, company
+            ): probe
+            for probe in probes
+        }
+        results = {}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[futures[future].priority] = future.result()
+
+                # The answer is settled once every probe ranked above
+                # the best hit so far has come back empty
+                for probe in probes:
+                    if probe.priority not in results:
+                        break
+                    if results[probe.priority]:
+                        return results[probe.priority]
+            return None
+        finally:
+            cancelled.set()
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self, wait=False):
+        """
+        Stop the probe threads, cancelling queued probes. With `wait`,
+        return once the probes still running have finished.
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
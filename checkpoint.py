@@ -0,0 +1,151 @@
+"""Per-company progress checkpoints for the accounts CSV.
+
+Progress is appended to a JSON-lines journal next to the input CSV instead
+of rewriting the CSV after every company. The journal is periodically
+compacted back into the CSV: the merged CSV is written to a temporary file
+and atomically moved into place, so a killed run never leaves a half
+written CSV behind. A journal left by a previous run is compacted as soon
+as the store opens, so the CSV alone tells which companies are done and
+only progress not yet compacted is kept in memory. Accounts are read from a
+snapshot, so the CSV can be replaced mid-run even on Windows. Should it be
+held open by another program, periodic compaction stops after the first
+failure and the journal is compacted when the store closes.
+"""
+import csv
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+CAREER_LINK_COLUMN = "Career Link"
+STATUS_COLUMN = "Scrape Status"
+UPDATED_COLUMN = "Last Updated"
+CHECKPOINT_COLUMNS = [CAREER_LINK_COLUMN, STATUS_COLUMN, UPDATED_COLUMN]
+
+CAREER_LINK_FOUND = "career_link_found"
+DONE = "done"
+NO_CAREER_PAGE = "no_career_page"
+FAILED = "failed"
+
+# Companies in these states are not processed again on resume
+FINISHED_STATUSES = {DONE, NO_CAREER_PAGE}
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class CheckpointStore:
+    def __init__(self, csv_path, journal_path=None, compact_every=200):
+        """
+        Open the journal of `csv_path` and load the progress it records.
+        The journal is compacted into the CSV every `compact_every` records.
+        """
+        self.csv_path = csv_path
+        self.journal_path = journal_path or f"{csv_path}.journal"
+        self.compact_every = compact_every
+        self.entries = {}
+        self._pending = 0
+        self._deferred = False
+        self._lock = threading.Lock()
+        self._load()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self.compact()
+
+    def _load(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A run killed mid-write leaves a truncated last line
+                    continue
+                self._merge(record)
+                self._pending += 1
+
+    def _merge(self, record):
+        entry = self.entries.setdefault(record["website"], {})
+        entry.update({key: value for key, value in record.items() if value})
+
+    def get(self, website):
+        """
+        Return the progress of a company journalled since the last
+        compaction, or an empty dict.
+        """
+        return self.entries.get(website, {})
+
+    def record(self, website, status, career_link=None):
+        """Journal the progress of a company."""
+        record = {
+            "website": website,
+            "career_link": career_link,
+            "status": status,
+            "updated_at": _now(),
+        }
+        with self._lock:
+            self._merge(record)
+            self._journal.write(json.dumps(record) + "\n")
+            self._journal.flush()
+            self._pending += 1
+            if self._pending >= self.compact_every and not self._deferred:
+                self._compact()
+
+    def compact(self):
+        """Merge the journal into the CSV and start a fresh journal."""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        if not self._pending:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.csv_path))
+        with open(self.csv_path, newline="", encoding="utf-8-sig") as source:
+            reader = csv.DictReader(source)
+            fieldnames = list(reader.fieldnames or [])
+            fieldnames += [
+                column for column in CHECKPOINT_COLUMNS if column not in fieldnames
+            ]
+            with tempfile.NamedTemporaryFile(
+                "w",
+                newline="",
+                encoding="utf-8",
+                dir=directory,
+                suffix=".tmp",
+                delete=False,
+            ) as target:
+                writer = csv.DictWriter(target, fieldnames=fieldnames)
+                writer.writeheader()
+                for row in reader:
+                    entry = self.entries.get((row.get("Website") or "").strip())
+                    if entry:
+                        row[CAREER_LINK_COLUMN] = entry.get(
+                            "career_link", row.get(CAREER_LINK_COLUMN)
+                        )
+                        row[STATUS_COLUMN] = entry.get("status")
+                        row[UPDATED_COLUMN] = entry.get("updated_at")
+                    writer.writerow(row)
+        try:
+            os.replace(target.name, self.csv_path)
+        except OSError as e:
+            # Windows refuses to replace a file that is still being read;
+            # the journal is kept and compacted when the store closes
+            print(f"Could not compact {self.journal_path}, deferring: {e}")
+            os.remove(target.name)
+            self._deferred = True
+            return
+
+        # Everything journalled so far is now in the CSV
+        self._journal.close()
+        self._journal = open(self.journal_path, "w", encoding="utf-8")
+        self.entries = {}
+        self._pending = 0
+
+    def close(self):
+        """Compact the journal into the CSV and close it."""
+        with self._lock:
+            self._compact()
+            self._journal.close()
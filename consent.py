@@ -0,0 +1,280 @@
+"""Cookie consent dismissal.
+
+Most cookie banners come from a handful of consent management platforms,
+each with a fixed accept button. One script checks the rules of the known
+platforms, and failing those a generic accept button inside something that
+looks like a banner, and clicks the first visible match in the page. The
+platform that worked is remembered per domain and tried first next time,
+and so are the domains that showed no banner, or one no rule matches,
+which are not waited on again. A domain accepted once is skipped for the
+rest of the browser session, as its consent cookie is already set.
+"""
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Outcomes besides the name of the rule that clicked
+GENERIC = "generic"
+NO_BANNER = "no_banner"
+ALREADY_ACCEPTED = "already_accepted"
+FAILED = "failed"
+
+# (name, banner selector, accept button selector, shadow root host or None)
+CMP_RULES = [
+    (
+        "onetrust",
+        "#onetrust-banner-sdk",
+        "#onetrust-accept-btn-handler",
+        None,
+    ),
+    (
+        "cookiebot",
+        "#CybotCookiebotDialog",
+        "#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll, "
+        "#CybotCookiebotDialogBodyButtonAccept",
+        None,
+    ),
+    ("didomi", "#didomi-host", "#didomi-notice-agree-button", None),
+    (
+        "quantcast",
+        ".qc-cmp2-container",
+        ".qc-cmp2-summary-buttons button[mode='primary']",
+        None,
+    ),
+    ("trustarc", "#truste-consent-track", "#truste-consent-button", None),
+    (
+        "usercentrics",
+        "[data-testid='uc-default-banner'], #uc-center-container",
+        "[data-testid='uc-accept-all-button']",
+        "#usercentrics-root",
+    ),
+    ("osano", ".osano-cm-window", ".osano-cm-accept-all", None),
+    ("cookieyes", ".cky-consent-container", ".cky-btn-accept", None),
+    ("complianz", "#cmplz-cookiebanner-container", ".cmplz-accept", None),
+    ("iubenda", "#iubenda-cs-banner", ".iubenda-cs-accept-btn", None),
+    ("axeptio", "#axeptio_overlay", "#axeptio_btn_acceptAll", None),
+    ("klaro", ".klaro .cookie-notice", ".cm-btn-accept-all, .cm-btn-success", None),
+    (
+        "borlabs",
+        "#BorlabsCookieBox",
+        "#BorlabsCookieBox [data-cookie-accept-all], "
+        "#BorlabsCookieBox [data-cookie-accept]",
+        None,
+    ),
+    ("civic", "#ccc", "#ccc-recommended-settings, #ccc-notify-accept", None),
+    ("cookieconsent", ".cc-window", ".cc-btn.cc-allow, .cc-btn.cc-dismiss", None),
+]
+
+# Elements a banner of an unknown platform is likely to sit in
+BANNER_SELECTOR = (
+    "[id*='cookie' i], [class*='cookie' i], [id*='consent' i], "
+    "[class*='consent' i], [id*='gdpr' i], [class*='gdpr' i], "
+    "[aria-label*='cookie' i], [aria-label*='consent' i]"
+)
+
+# Texts of generic accept buttons, in full
+ACCEPT_TEXTS = [
+    "accept",
+    "accept all",
+    "accept all cookies",
+    "accept cookies",
+    "accept and close",
+    "accept and continue",
+    "allow",
+    "allow all",
+    "allow all cookies",
+    "allow cookies",
+    "agree",
+    "agree and close",
+    "agree and continue",
+    "i accept",
+    "i agree",
+    "got it",
+    "ok",
+    "okay",
+    "alle akzeptieren",
+    "akzeptieren",
+    "alle cookies akzeptieren",
+    "tout accepter",
+    "accepter",
+    "j'accepte",
+    "aceptar",
+    "aceptar todo",
+    "aceptar todas",
+    "accetta",
+    "accetta tutti",
+    "alles accepteren",
+    "accepteren",
+    "aceitar",
+    "aceitar todos",
+]
+
+CONSENT_SCRIPT = """
+const [rules, preferred, acceptTexts, bannerSelector] = arguments;
+
+function visible(element) {
+    return !!(element && (element.offsetWidth || element.offsetHeight
+        || element.getClientRects().length));
+}
+
+function find(root, selector) {
+    try {
+        return Array.from(root.querySelectorAll(selector)).find(visible);
+    } catch (e) {
+        return undefined;
+    }
+}
+
+const ordered = rules.filter((rule) => rule[0] === preferred)
+    .concat(rules.filter((rule) => rule[0] !== preferred));
+let banner = false;
+for (const [name, bannerRule, acceptRule, shadowHost] of ordered) {
+    let root = document;
+    if (shadowHost) {
+        const host = document.querySelector(shadowHost);
+        if (!host || !host.shadowRoot) {
+            continue;
+        }
+        root = host.shadowRoot;
+    }
+    const button = find(root, acceptRule);
+    if (button) {
+        button.click();
+        return {clicked: name};
+    }
+    banner = banner || !!root.querySelector(bannerRule);
+}
+
+const accepted = new Set(acceptTexts);
+const banners = Array.from(document.querySelectorAll(bannerSelector))
+    .filter(visible);
+for (const container of banners) {
+    const candidates = container.querySelectorAll(
+        "button, a, [role='button'], input[type='button'], input[type='submit']"
+    );
+    for (const candidate of candidates) {
+        const text = (candidate.value || candidate.textContent || "")
+            .replace(/\\s+/g, " ").trim().replace(/[.!]+$/, "").toLowerCase();
+        if (accepted.has(text) && visible(candidate)) {
+            candidate.click();
+            return {clicked: "generic"};
+        }
+    }
+}
+return {clicked: null, banner: banner || banners.length > 0};
+"""
+
+
+def consent_domain(url):
+    """Return the domain consent is remembered for."""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class _BannerSettled:
+    """Wait condition: a button was clicked, or no banner showed up."""
+
+    def __init__(self, handler, preferred, settle):
+        self.handler = handler
+        self.preferred = preferred
+        self.settle = settle
+        self.started = time.perf_counter()
+        self.banner_seen = False
+
+    def __call__(self, driver):
+        outcome = driver.execute_script(
+            CONSENT_SCRIPT,
+            self.handler.rules,
+            self.preferred,
+            self.handler.accept_texts,
+            BANNER_SELECTOR,
+        )
+        if outcome["clicked"]:
+            return outcome["clicked"]
+        if outcome["banner"]:
+            self.banner_seen = True
+            return False
+        # CMPs inject their banner shortly after load; past that, give up
+        if time.perf_counter() - self.started < self.settle:
+            return False
+        ready = driver.execute_script("return document.readyState;")
+        return NO_BANNER if ready == "complete" else False
+
+
+class ConsentHandler:
+    def __init__(
+        self,
+        rules=CMP_RULES,
+        accept_texts=ACCEPT_TEXTS,
+        max_wait=3,
+        settle=0.5,
+        poll_interval=0.1,
+    ):
+        """
+        Initialise the handler. A banner is waited on for at most
+        `max_wait` seconds, and a page showing none after `settle` seconds
+        is taken to have none.
+        """
+        self.rules = [list(rule) for rule in rules]
+        self.accept_texts = list(accept_texts)
+        self.max_wait = max_wait
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.domain_rules = {}
+        self.sessions = {}
+        self.outcomes = Counter()
+        self._lock = threading.Lock()
+
+    def _record(self, outcome):
+        with self._lock:
+            self.outcomes[outcome] += 1
+        return outcome
+
+    def dismiss(self, driver, url):
+        """
+        Accept the cookie banner of the page open in `driver`, loaded from
+        `url`. Return the rule that clicked, or why nothing was clicked.
+        """
+        domain = consent_domain(url)
+        session = driver.session_id
+        with self._lock:
+            accepted = self.sessions.setdefault(session, set())
+            remembered = self.domain_rules.get(domain)
+        if domain in accepted:
+            return self._record(ALREADY_ACCEPTED)
+        if remembered in (NO_BANNER, FAILED):
+            # Waiting again would end the same way
+            return self._record(remembered)
+
+        condition = _BannerSettled(self, remembered, self.settle)
+        try:
+            outcome = WebDriverWait(
+                driver,
+                self.max_wait,
+                poll_frequency=self.poll_interval,
+            ).until(condition)
+        except TimeoutException:
+            # A banner no rule matched, or a page still loading without one
+            outcome = FAILED if condition.banner_seen else NO_BANNER
+        except WebDriverException:
+            return self._record(FAILED)
+
+        clicked = outcome not in (NO_BANNER, FAILED)
+        with self._lock:
+            # A domain whose banner was accepted before keeps its rule
+            if clicked or remembered is None:
+                self.domain_rules[domain] = outcome
+            if clicked:
+                accepted.add(domain)
+        return self._record(outcome)
+
+    def print_report(self):
+        """Print how the cookie banners of the run were handled."""
+        with self._lock:
+            outcomes = dict(self.outcomes)
+        for outcome, count in sorted(outcomes.items()):
+            print(f"cookie consent ({outcome}): {count} pages")
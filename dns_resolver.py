@@ -0,0 +1,121 @@
+"""Concurrent DNS pre-resolution for career subdomain candidates.
+
+Most companies have no careers., jobs. or hiring. host, so resolving every
+candidate subdomain for a batch of companies at once, before any HTTP
+probe, leaves only hosts that actually exist to be probed. Resolution runs
+on an asyncio loop, with aiodns when it is installed, and keeps its own
+cache of answers.
+"""
+import asyncio
+import socket
+import threading
+import time
+
+try:
+    import aiodns
+except ImportError:
+    aiodns = None
+
+# The aiodns errors that say the host does not exist, or has no address of
+# either family
+if aiodns is not None:
+    MISSING_HOST_ERRORS = {aiodns.error.ARES_ENOTFOUND, aiodns.error.ARES_ENODATA}
+else:
+    MISSING_HOST_ERRORS = set()
+
+
+class AsyncResolver:
+    def __init__(self, concurrency=100, timeout=5, ttl=3600, negative_ttl=600):
+        """
+        Initialise the resolver. At most `concurrency` lookups run at once
+        and each gives up after `timeout` seconds. Answers are cached for
+        `ttl` seconds, unresolvable hosts for `negative_ttl` seconds.
+        """
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def resolves(self, host):
+        """
+        Return whether the host resolved when last looked up, or None if
+        it has not been looked up or the answer expired.
+        """
+        with self._lock:
+            answer = self._cache.get(host)
+        if answer is None or answer[1] < time.monotonic():
+            return None
+        return answer[0]
+
+    def resolve_many(self, hosts):
+        """Resolve the hosts concurrently and return {host: resolves}."""
+        answers = {}
+        missing = []
+        for host in dict.fromkeys(hosts):
+            resolves = self.resolves(host)
+            if resolves is None:
+                missing.append(host)
+            else:
+                answers[host] = resolves
+
+        if missing:
+            resolved = asyncio.run(self._resolve_all(missing))
+            now = time.monotonic()
+            with self._lock:
+                self._prune(now)
+                for host, resolves in resolved.items():
+                    ttl = self.ttl if resolves else self.negative_ttl
+                    self._cache[host] = (resolves, now + ttl)
+            answers.update(resolved)
+        return answers
+
+    def _prune(self, now):
+        expired = [
+            host for host, (_, expires) in self._cache.items() if expires < now
+        ]
+        for host in expired:
+            del self._cache[host]
+
+    async def _resolve_all(self, hosts):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        dns_resolver = aiodns.DNSResolver() if aiodns is not None else None
+
+        async def resolve(host):
+            async with semaphore:
+                try:
+                    await asyncio.wait_for(
+                        self._lookup(host, dns_resolver),
+                        self.timeout,
+                    )
+                    return host, True
+                except asyncio.TimeoutError:
+                    # A slow or failed lookup is not a missing host, the
+                    # HTTP probe decides for those
+                    return host, None
+                except socket.gaierror as e:
+                    if e.errno == socket.EAI_AGAIN:
+                        return host, None
+                    return host, False
+                except OSError:
+                    return host, None
+                except Exception as e:
+                    # aiodns reports every failure with its own error type,
+                    # the code telling a missing host from a failed lookup
+                    if aiodns is not None and isinstance(e, aiodns.error.DNSError):
+                        missing = e.args and e.args[0] in MISSING_HOST_ERRORS
+                        return host, False if missing else None
+                    raise
+
+        results = await asyncio.gather(*(resolve(host) for host in hosts))
+        return {
+            host: resolves for host, resolves in results if resolves is not None
+        }
+
+    async def _lookup(self, host, dns_resolver):
+        if dns_resolver is not None:
+            # Either family will do; a host with only AAAA records exists
+            return await dns_resolver.gethostbyname(host, socket.AF_UNSPEC)
+        loop = asyncio.get_running_loop()
+        return await loop.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
@@ -0,0 +1,170 @@
+"""Crawl frontier with per-host politeness.
+
+Every request the scrapper sends, from homepages and discovery probes to
+job pages, first takes a slot on its host from the frontier. A host serves
+at most `per_host_limit` requests at once and starts them at least
+`min_delay` seconds apart, so parallel workers never hammer one host, such
+as an ATS shared by many companies. Requests waiting for a host are served
+by stage, the stage closest to completing a company first, then in arrival
+order. The frontier also deduplicates URLs and reports its queue depth and
+the time requests spent waiting.
+"""
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# Stages of the work on a company, the one closest to completing it first
+JOB = 0
+JOBS_INDEX = 1
+CAREER_PAGE = 2
+PROBE = 3
+HOMEPAGE = 4
+
+STAGE_NAMES = {
+    JOB: "job",
+    JOBS_INDEX: "jobs_index",
+    CAREER_PAGE: "career_page",
+    PROBE: "probe",
+    HOMEPAGE: "homepage",
+}
+
+# How often an abandonable wait checks whether it should give up
+POLL_INTERVAL = 0.1
+
+
+class _Host:
+    def __init__(self, limit, delay):
+        self.limit = limit
+        self.delay = delay
+        self.active = 0
+        self.next_start = 0.0
+        self.waiting = []
+
+
+class Frontier:
+    def __init__(self, per_host_limit=4, min_delay=0.25, host_budgets=None):
+        """
+        Initialise the frontier. `host_budgets` maps hosts to the
+        (concurrency limit, delay) they get instead of the defaults.
+        """
+        self.per_host_limit = per_host_limit
+        self.min_delay = min_delay
+        self.host_budgets = host_budgets or {}
+        self._hosts = {}
+        self._seen = set()
+        self._tickets = itertools.count()
+        self._condition = threading.Condition()
+        self.depth = 0
+        self.max_depth = 0
+        self.waits = {
+            stage: {"requests": 0, "seconds": 0.0, "max_seconds": 0.0}
+            for stage in STAGE_NAMES
+        }
+
+    def add(self, url):
+        """Mark the URL as queued. Return False if it was seen before."""
+        with self._condition:
+            if url in self._seen:
+                return False
+            self._seen.add(url)
+            return True
+
+    def _host(self, url):
+        name = (urlparse(url).hostname or "").lower()
+        host = self._hosts.get(name)
+        if host is None:
+            limit, delay = self.host_budgets.get(
+                name, (self.per_host_limit, self.min_delay)
+            )
+            host = self._hosts[name] = _Host(limit, delay)
+        return host
+
+    def _acquire(self, url, stage, should_stop):
+        started = time.monotonic()
+        with self._condition:
+            host = self._host(url)
+            entry = (stage, next(self._tickets))
+            heapq.heappush(host.waiting, entry)
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+            try:
+                while True:
+                    if should_stop is not None and should_stop():
+                        host.waiting.remove(entry)
+                        heapq.heapify(host.waiting)
+                        self._condition.notify_all()
+                        return None
+                    now = time.monotonic()
+                    if host.waiting[0] == entry and host.active < host.limit:
+                        if now >= host.next_start:
+                            break
+                        timeout = host.next_start - now
+                    else:
+                        timeout = None
+                    if should_stop is not None:
+                        timeout = min(timeout or POLL_INTERVAL, POLL_INTERVAL)
+                    self._condition.wait(timeout)
+
+                heapq.heappop(host.waiting)
+                host.active += 1
+                host.next_start = now + host.delay
+                # The next waiter may be able to start too
+                self._condition.notify_all()
+            finally:
+                self.depth -= 1
+
+            waited = time.monotonic() - started
+            waits = self.waits[stage]
+            waits["requests"] += 1
+            waits["seconds"] += waited
+            waits["max_seconds"] = max(waits["max_seconds"], waited)
+        return host
+
+    def _release(self, host):
+        with self._condition:
+            host.active -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, url, stage, should_stop=None):
+        """
+        Wait for a slot on the URL's host and hold it for the duration of
+        the block. The block gets False instead when `should_stop()` turns
+        True while waiting.
+        """
+        host = self._acquire(url, stage, should_stop)
+        if host is None:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            self._release(host)
+
+    def report(self):
+        """Return the queue depth and the time spent waiting, per stage."""
+        with self._condition:
+            return {
+                "queued": self.depth,
+                "max_queued": self.max_depth,
+                "in_flight": sum(host.active for host in self._hosts.values()),
+                "waits": {
+                    STAGE_NAMES[stage]: dict(waits)
+                    for stage, waits in self.waits.items()
+                    if waits["requests"]
+                },
+            }
+
+    def print_report(self):
+        """Print the frontier report."""
+        report = self.report()
+        print(f"frontier: {report['max_queued']} requests queued at most")
+        for stage, waits in report["waits"].items():
+            print(
+                f"{stage}: {waits['requests']} requests, "
+                f"{waits['seconds'] / waits['requests']:.2f}s average wait, "
+                f"{waits['max_seconds']:.2f}s longest wait"
+            )
@@ -0,0 +1,142 @@
+"""HTML parser backends and page cleaning.
+
+Soups are built with lxml when it is installed and with Python's
+html.parser otherwise. The SCRAPPER_HTML_PARSER environment variable or the
+--html-parser option picks a backend explicitly. The "selectolax" backend
+prunes pages with selectolax's C parser before the one BeautifulSoup parse,
+so cleaned pages are never parsed twice.
+"""
+import os
+import re
+
+from bs4 import BeautifulSoup, NavigableString
+
+try:
+    import lxml  # noqa: F401
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+HTML_PARSER = "html.parser"
+LXML = "lxml"
+SELECTOLAX = "selectolax"
+PARSERS = [HTML_PARSER, LXML, SELECTOLAX]
+
+REMOVED_TAGS = [
+    "script",
+    "img",
+    "video",
+    "audio",
+    "noscript",
+    "iframe",
+    "svg",
+    "footer",
+    "nav",
+    "header",
+]
+
+ALLOWED_ATTRS = {"id", "class", "href"}
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def available_parsers():
+    """Return the backends that can be used in this environment."""
+    parsers = [HTML_PARSER]
+    if lxml is not None:
+        parsers.append(LXML)
+        if SelectolaxParser is not None:
+            parsers.append(SELECTOLAX)
+    return parsers
+
+
+def default_parser():
+    """
+    Return the configured backend, else the fastest available one. Raise
+    ValueError when the configured backend is unknown or not installed.
+    """
+    parser = os.environ.get("SCRAPPER_HTML_PARSER")
+    if parser:
+        if parser not in available_parsers():
+            raise ValueError(
+                f"SCRAPPER_HTML_PARSER={parser!r} is not an available HTML "
+                f"parser; choose one of {', '.join(available_parsers())}"
+            )
+        return parser
+    return LXML if lxml is not None else HTML_PARSER
+
+
+def _soup_builder(parser):
+    # selectolax only prunes, the soup itself is built by lxml
+    return LXML if parser == SELECTOLAX else parser
+
+
+def make_soup(html, parser=None, do_clean=False):
+    """Parse HTML into a BeautifulSoup object, optionally cleaned."""
+    parser = parser or default_parser()
+    if do_clean and parser == SELECTOLAX:
+        return BeautifulSoup(prune_html(html), _soup_builder(parser))
+    soup_obj = BeautifulSoup(html, _soup_builder(parser))
+    if do_clean:
+        soup_obj = clean_soup(soup_obj)
+    return soup_obj
+
+
+def clean_soup(soup_obj):
+    """
+    Remove unwanted tags and attributes and collapse whitespace, in place.
+    Return the body tag, or the soup itself when there is no body.
+    """
+    for tag in soup_obj.find_all(REMOVED_TAGS):
+        tag.decompose()
+
+    body_tag = soup_obj.find("body")
+    if body_tag is None:
+        body_tag = soup_obj
+
+    for tag in body_tag.find_all(True):
+        if not ALLOWED_ATTRS.issuperset(tag.attrs):
+            tag.attrs = {
+                key: value
+                for key, value in tag.attrs.items()
+                if key in ALLOWED_ATTRS
+            }
+
+    strings = [
+        string
+        for string in body_tag.descendants
+        if isinstance(string, NavigableString)
+    ]
+    for string in strings:
+        collapsed = WHITESPACE.sub(" ", string)
+        if collapsed != string:
+            string.replace_with(type(string)(collapsed))
+
+    return body_tag
+
+
+def prune_html(html):
+    """Return the cleaned body of a page, pruned with selectolax."""
+    tree = SelectolaxParser(html)
+    body = tree.body
+    if body is None:
+        return html
+
+    for node in body.css(",".join(REMOVED_TAGS)):
+        node.decompose()
+    for node in body.traverse():
+        # Text and comment nodes are tagged "-text" and "-comment"
+        if node.tag.startswith("-"):
+            continue
+        attrs = node.attrs
+        for key in [key for key in attrs if key not in ALLOWED_ATTRS]:
+            del attrs[key]
+
+    return WHITESPACE.sub(" ", body.html)
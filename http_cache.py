@@ -0,0 +1,252 @@
+"""Persistent HTTP response cache shared by every plain HTTP request.
+
+Successful GET responses are stored in a SQLite file keyed by URL. Within
+the TTL a cached response is served without touching the network. After
+that it is revalidated with If-None-Match / If-Modified-Since, so an
+unchanged page costs a 304 instead of a full download. The cache is kept
+under a size budget by evicting the least recently used responses.
+
+Streamed GETs, like sitemaps, are served from and revalidated against the
+cache the same way. A streamed response is only stored when its
+Content-Length says it is small, as storing means reading it whole; larger
+or unsized ones keep streaming and are fetched again next time.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_CACHE_PATH = ".http_cache.sqlite"
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 512 * 2**20
+DEFAULT_MAX_STREAMED_BYTES = 2 * 2**20
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path=DEFAULT_CACHE_PATH,
+        ttl=DEFAULT_TTL,
+        max_bytes=DEFAULT_MAX_BYTES,
+    ):
+        """
+        Open the cache file, creating it if needed. Entries are served
+        without revalidation for `ttl` seconds and the bodies are kept
+        under `max_bytes` in total.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                final_url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)"
+        )
+        (self.size,) = self.connection.execute(
+            "SELECT COALESCE(SUM(LENGTH(body)), 0) FROM responses"
+        ).fetchone()
+
+    def count(self, outcome):
+        """Count a cache hit, revalidation or miss."""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self):
+        """Return the hit, revalidation and miss counts and the size."""
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "bytes": self.size,
+        }
+
+    def get(self, url):
+        """Return the cached entry for `url` as a dict, or None."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT final_url, status, headers, body, stored_at "
+                "FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        final_url, status, headers, body, stored_at = row
+        return {
+            "url": final_url,
+            "status": status,
+            "headers": json.loads(headers),
+            "body": body,
+            "stored_at": stored_at,
+        }
+
+    def is_fresh(self, entry):
+        """Return whether an entry can be served without revalidation."""
+        return time.time() - entry["stored_at"] < self.ttl
+
+    def touch(self, url, revalidated=False):
+        """Mark an entry as used, and as fresh again after a 304."""
+        now = time.time()
+        with self._lock, self.connection:
+            if revalidated:
+                self.connection.execute(
+                    "UPDATE responses SET accessed_at = ?, stored_at = ? "
+                    "WHERE url = ?",
+                    (now, now, url),
+                )
+            else:
+                self.connection.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE url = ?",
+                    (now, url),
+                )
+
+    def store(self, url, response):
+        """Store a response, evicting old entries past the size budget."""
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self.connection:
+            previous = self.connection.execute(
+                "SELECT LENGTH(body) FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    response.url,
+                    response.status_code,
+                    json.dumps(dict(response.headers)),
+                    body,
+                    now,
+                    now,
+                ),
+            )
+            self.size += len(body) - (previous[0] if previous else 0)
+            self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes:
+            rows = self.connection.execute(
+                "SELECT url, LENGTH(body) FROM responses "
+                "ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self.size = 0
+                return
+            for url, size in rows:
+                self.connection.execute(
+                    "DELETE FROM responses WHERE url = ?",
+                    (url,),
+                )
+                self.size -= size
+                if self.size <= self.max_bytes:
+                    return
+
+    def close(self):
+        """Close the cache file."""
+        with self._lock:
+            self.connection.close()
+
+
+def response_from_entry(entry):
+    """Rebuild a requests.Response from a cache entry."""
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response._content = entry["body"]
+    response.url = entry["url"]
+    response.encoding = get_encoding_from_headers(response.headers)
+    # Streaming reads the body from memory like any read response
+    response._content_consumed = True
+    response.from_cache = True
+    return response
+
+
+class CachedSession(requests.Session):
+    """A requests session that serves GETs from a ResponseCache."""
+
+    def __init__(self, cache, max_streamed_bytes=DEFAULT_MAX_STREAMED_BYTES):
+        """
+        Initialise the session. Streamed responses are cached up to
+        `max_streamed_bytes` long.
+        """
+        super().__init__()
+        self.cache = cache
+        self.max_streamed_bytes = max_streamed_bytes
+
+    def _storable(self, response, stream):
+        if response.status_code != 200:
+            return False
+        if "no-store" in response.headers.get("Cache-Control", ""):
+            return False
+        if not stream:
+            return True
+        try:
+            length = int(response.headers.get("Content-Length", ""))
+        except ValueError:
+            return False
+        return length <= self.max_streamed_bytes
+
+    def request(self, method, url, **kwargs):
+        if method.upper() != "GET":
+            return super().request(method, url, **kwargs)
+
+        entry = self.cache.get(url)
+        if entry is not None and self.cache.is_fresh(entry):
+            self.cache.count("hits")
+            self.cache.touch(url)
+            return response_from_entry(entry)
+
+        if entry is not None:
+            headers = dict(kwargs.get("headers") or {})
+            cached_headers = CaseInsensitiveDict(entry["headers"])
+            if "ETag" in cached_headers:
+                headers["If-None-Match"] = cached_headers["ETag"]
+            if "Last-Modified" in cached_headers:
+                headers["If-Modified-Since"] = cached_headers["Last-Modified"]
+            kwargs["headers"] = headers
+
+        response = super().request(method, url, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.cache.count("revalidations")
+            self.cache.touch(url, revalidated=True)
+            return response_from_entry(entry)
+
+        self.cache.count("misses")
+        if self._storable(response, kwargs.get("stream")):
+            self.cache.store(url, response)
+        return response
+
+
+def build_session(pool_size=32, cache=None):
+    """
+    Return a session with a connection pool of `pool_size` per host,
+    served from `cache` when one is given.
+    """
+    session = CachedSession(cache) if cache is not None else requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
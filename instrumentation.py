@@ -0,0 +1,210 @@
+"""Per-stage timing of the scrapper pipeline.
+
+Every timed stage of every company, from page fetches, with the tier that
+served each page, navigation and cookie handling to parsing, career
+discovery per probe type, extraction, job scraping and writes, is recorded
+with its duration. Each record can also be appended to
+a JSON-lines file as an event carrying the company being processed, so a
+run can be analysed afterwards. The end-of-run summary gives the median
+and 95th percentile time of every stage and the pages fetched per minute.
+Memory stays flat however long the run: each stage keeps its count, total
+and maximum, and a fixed-size uniform sample of its times for percentiles.
+"""
+import json
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+COMPANY = "company"
+FETCH = "fetch"
+NAVIGATION = "navigation"
+COOKIES = "cookies"
+PARSE = "parse"
+HTTP_FETCH = "http_fetch"
+DISCOVERY = "discovery"
+ATS_FEED = "ats_feed"
+JOB_SCRAPING = "job_scraping"
+WRITE = "write"
+
+# Times kept per stage to estimate its percentiles from
+DEFAULT_SAMPLE_SIZE = 1000
+
+
+def discovery_stage(kind):
+    """Return the stage timing career discovery probes of `kind`."""
+    return f"{DISCOVERY}_{kind}"
+
+
+def extraction_stage(name):
+    """Return the stage timing extraction on pages fetched as `name`."""
+    return f"{name}_extraction"
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of `values`, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+class StageTimes:
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE, rng=random):
+        """
+        Initialise the times of a stage. At most `sample_size` of them are
+        kept, a uniform sample of all those added.
+        """
+        self.sample_size = sample_size
+        self.rng = rng
+        self.count = 0
+        self.seconds = 0.0
+        self.max = 0.0
+        self.sample = []
+
+    def add(self, seconds):
+        """Add one time of the stage."""
+        self.count += 1
+        self.seconds += seconds
+        self.max = max(self.max, seconds)
+        if len(self.sample) < self.sample_size:
+            self.sample.append(seconds)
+            return
+        # Reservoir sampling: the new time replaces a kept one with the
+        # probability that keeps the sample uniform
+        index = self.rng.randrange(self.count)
+        if index < self.sample_size:
+            self.sample[index] = seconds
+
+    def summary(self):
+        """Return the count, total, estimated p50 and p95, and maximum."""
+        return {
+            "count": self.count,
+            "seconds": self.seconds,
+            "p50": percentile(self.sample, 0.5),
+            "p95": percentile(self.sample, 0.95),
+            "max": self.max,
+        }
+
+
+class Instrumentation:
+    def __init__(self, events_path=None, sample_size=DEFAULT_SAMPLE_SIZE):
+        """
+        Start timing a run. Events are appended to `events_path` as JSON
+        lines unless it is None. Percentiles are estimated from
+        `sample_size` times per stage.
+        """
+        self.events_path = events_path
+        self._events = (
+            open(events_path, "a", buffering=1, encoding="utf-8")
+            if events_path
+            else None
+        )
+        self.sample_size = sample_size
+        self.stages = {}
+        self.pages = 0
+        self.started = time.perf_counter()
+        self._context = threading.local()
+        self._lock = threading.Lock()
+
+    def current_company(self):
+        """
+        Return the company this thread is processing, to hand to the
+        threads that work for it.
+        """
+        return getattr(self._context, "company", None)
+
+    def record(self, stage, seconds, **fields):
+        """
+        Record that `stage` took `seconds`, with event `fields`. The event
+        carries the company of the thread unless `fields` names one.
+        """
+        event = {
+            "time": time.time(),
+            "stage": stage,
+            "seconds": round(seconds, 6),
+            "company": self.current_company(),
+        }
+        event.update(fields)
+        with self._lock:
+            times = self.stages.get(stage)
+            if times is None:
+                times = self.stages[stage] = StageTimes(self.sample_size)
+            times.add(seconds)
+            if self._events is not None:
+                self._events.write(json.dumps(event) + "\n")
+
+    @contextmanager
+    def stage(self, stage, **fields):
+        """
+        Time the block as `stage`. The block gets the event fields, to add
+        what it learns.
+        """
+        started = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.record(stage, time.perf_counter() - started, **fields)
+
+    @contextmanager
+    def company(self, website):
+        """Time the block as the processing of one company."""
+        self._context.company = website
+        try:
+            with self.stage(COMPANY) as fields:
+                yield fields
+        finally:
+            self._context.company = None
+
+    def count_page(self):
+        """Count a page fetched by either tier."""
+        with self._lock:
+            self.pages += 1
+
+    def summary(self):
+        """Return the run totals and the timing of every stage."""
+        elapsed = time.perf_counter() - self.started
+        with self._lock:
+            stages = {stage: times.summary() for stage, times in self.stages.items()}
+            pages = self.pages
+        return {
+            "elapsed_seconds": elapsed,
+            "pages": pages,
+            "pages_per_minute": pages / elapsed * 60 if elapsed else 0.0,
+            "stages": stages,
+        }
+
+    def print_summary(self, format_time=None):
+        """
+        Print the run summary, slowest stages in total first. `format_time`
+        formats the elapsed seconds.
+        """
+        summary = self.summary()
+        elapsed = summary["elapsed_seconds"]
+        if format_time is not None:
+            elapsed = format_time(elapsed)
+        else:
+            elapsed = f"{elapsed:.0f}s"
+        print(
+            f"run: {elapsed}, {summary['pages']} pages, "
+            f"{summary['pages_per_minute']:.1f} pages per minute"
+        )
+        stages = sorted(
+            summary["stages"].items(),
+            key=lambda item: item[1]["seconds"],
+            reverse=True,
+        )
+        for stage, timing in stages:
+            print(
+                f"{stage}: {timing['count']} times, {timing['seconds']:.1f}s total, "
+                f"p50 {timing['p50']:.3f}s, p95 {timing['p95']:.3f}s, "
+                f"max {timing['max']:.3f}s"
+            )
+
+    def close(self):
+        """Close the events file."""
+        with self._lock:
+            if self._events is not None:
+                self._events.close()
+                self._events = None
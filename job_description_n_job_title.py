@@ -1,30 +1,96 @@
-def find_largest_text_block(soup, tags):
-    largest_block = ""
-    largest_block_text = ""
+from bs4 import CData, NavigableString, Tag
+
+TITLE_TAGS = ["h1", "h2", "h3"]
+DESCRIPTION_TAGS = ["div", "p", "span"]
+
+# The string types `.text` keeps for these tags; script, style and template
+# contents have their own NavigableString subclasses and are left out
+TEXT_STRING_TYPES = {NavigableString, CData}
+
+
+def _string_words(string):
+    # (word count, starts inside a word, ends inside a word)
+    return len(string.split()), not string[0].isspace(), not string[-1].isspace()
+
+
+def _join_words(left, right):
+    # Word counts of two concatenated texts, merging the word that spans
+    # the boundary when neither side has whitespace there
+    if left is None:
+        return right
+    if right is None:
+        return left
+    words = left[0] + right[0] - (left[2] and right[1])
+    return words, left[1], right[2]
+
 
-    for tag in tags:
-        elements = soup.find_all(tag)
-        for element in elements:
-            text = element.text.strip()
-            if len(text.split()) > len(largest_block_text.split()):
-                largest_block = element
-                largest_block_text = text
+def score_text_blocks(soup, block_tags=DESCRIPTION_TAGS, title_tags=TITLE_TAGS):
+    """
+    Walk the tree once and return ({title tag name: first such tag}, largest
+    text block). Word counts are built bottom-up from the children, so no
+    text is joined or split more than once. The largest block is the tag of
+    `block_tags` with the most words in its `.text`, ties going to the
+    earlier tag name in `block_tags`, then to the earlier tag in the
+    document, and None if no block has any words.
+    """
+    block_ranks = {name: rank for rank, name in enumerate(block_tags)}
+    titles = {}
+    best_key = None
+    best_block = None
+    words_by_tag = {}
 
-    return largest_block
+    position = 0
+    stack = [(soup, None)]
+    while stack:
+        node, node_position = stack.pop()
+        if node_position is None:
+            # First visit, in document order; revisit once the children
+            # have been counted
+            stack.append((node, position))
+            if node is not soup and node.name in title_tags:
+                titles.setdefault(node.name, node)
+            position += 1
+            stack.extend(
+                (child, None)
+                for child in reversed(node.contents)
+                if isinstance(child, Tag)
+            )
+            continue
+
+        words = None
+        for child in node.contents:
+            if isinstance(child, Tag):
+                words = _join_words(words, words_by_tag.pop(id(child)))
+            elif type(child) in TEXT_STRING_TYPES and child:
+                words = _join_words(words, _string_words(child))
+        words_by_tag[id(node)] = words
+
+        if node is not soup and node.name in block_ranks and words and words[0]:
+            key = (-words[0], block_ranks[node.name], node_position)
+            if best_key is None or key < best_key:
+                best_key = key
+                best_block = node
+
+    return titles, best_block
+
+
+def find_largest_text_block(soup, tags):
+    _, largest_block = score_text_blocks(soup, tags, [])
+    return largest_block or ""
 
 
 def heuristic_scrape(soup):
+    titles, largest_text_block = score_text_blocks(soup)
+
     # Heuristic 1: The job title is likely to be in an <h1>, <h2>, or <h3> tag
-    for tag in ["h1", "h2", "h3"]:
-        job_title = soup.find(tag)
-        if job_title:
-            job_title = job_title.text.strip()
+    job_title = None
+    for tag in TITLE_TAGS:
+        if tag in titles:
+            job_title = titles[tag].text.strip()
             break
 
     # Heuristic 2: The largest text block within <div>,
     # <p>, or <span> is likely to be the job description
-    largest_text_block = find_largest_text_block(soup, ["div", "p", "span"])
-
     if largest_text_block:
         job_description = largest_text_block.text.strip()
-        return {"Job Title": job_title, "Job Description": job_description}
\ No newline at end of file
+        return {"Job Title": job_title, "Job Description": job_description}
@@ -0,0 +1,240 @@
+"""Job detail extraction from structured data, with a heuristic fallback.
+
+Many job pages embed their posting as schema.org JobPosting data, which is
+cheaper and more accurate to read than guessing from the layout. JSON-LD
+and OpenGraph tags are read from the raw HTML with regexes, so no soup is
+built for them; microdata needs a soup, which is only built when the page
+mentions a JobPosting itemtype. Pages with none of these fall back to
+`heuristic_scrape`. Every strategy records how often it was tried, how
+often it found a job and how long it took.
+"""
+import html
+import json
+import re
+import threading
+import time
+
+from bs4 import BeautifulSoup
+
+from html_parsing import make_soup
+from job_description_n_job_title import heuristic_scrape
+
+JSON_LD = "json_ld"
+MICRODATA = "microdata"
+OPEN_GRAPH = "open_graph"
+HEURISTIC = "heuristic"
+STRATEGIES = [JSON_LD, MICRODATA, OPEN_GRAPH, HEURISTIC]
+
+# OpenGraph descriptions are usually teasers; shorter ones are not taken as
+# the job description
+MIN_OPEN_GRAPH_WORDS = 50
+
+_JSON_LD_SCRIPT = re.compile(
+    r"<script\b[^>]*\btype\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>"
+    r"(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+_MICRODATA_JOB = re.compile(
+    r"itemtype\s*=\s*[\"']?[^\"'>]*schema\.org/JobPosting",
+    re.IGNORECASE,
+)
+_MICRODATA_JOB_TYPE = re.compile(r"schema\.org/JobPosting", re.IGNORECASE)
+_HEAD_END = re.compile(r"</head\s*>", re.IGNORECASE)
+_META_TAG = re.compile(r"<meta\b[^>]*>", re.IGNORECASE)
+_ATTRIBUTE = re.compile(r"([\w:-]+)\s*=\s*(\"[^\"]*\"|'[^']*'|[^\s>]+)")
+
+
+def html_text(value):
+    """Return the plain text of an HTML or entity-escaped string."""
+    if not isinstance(value, str):
+        return ""
+    if "<" not in value and "&lt;" in value:
+        value = html.unescape(value)
+    if "<" in value:
+        value = BeautifulSoup(value, "html.parser").get_text(" ")
+    else:
+        value = html.unescape(value)
+    return " ".join(value.split())
+
+
+def _job(title, description):
+    description = html_text(description)
+    if not description:
+        return None
+    return {
+        "Job Title": html_text(title) or None,
+        "Job Description": description,
+    }
+
+
+def _is_job_posting(node):
+    types = node.get("@type")
+    if not isinstance(types, list):
+        types = [types]
+    return any(
+        isinstance(type_, str) and type_.endswith("JobPosting") for type_ in types
+    )
+
+
+def _json_ld_postings(data):
+    pending = [data]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(reversed(node))
+        elif isinstance(node, dict):
+            if _is_job_posting(node):
+                yield node
+            elif "@graph" in node:
+                pending.append(node["@graph"])
+
+
+def extract_json_ld(page_html):
+    """Return the job of the first JSON-LD JobPosting in the page, or None."""
+    for match in _JSON_LD_SCRIPT.finditer(page_html):
+        try:
+            data = json.loads(match.group(1).strip(), strict=False)
+        except ValueError:
+            continue
+        for posting in _json_ld_postings(data):
+            job = _job(
+                posting.get("title") or posting.get("name"),
+                posting.get("description"),
+            )
+            if job:
+                return job
+    return None
+
+
+def _itemprop_value(element):
+    if element is None:
+        return None
+    if element.name == "meta":
+        return element.get("content")
+    return element.get_text(" ")
+
+
+def extract_microdata(soup):
+    """Return the job of the first microdata JobPosting in the soup, or None."""
+    scope = soup.find(attrs={"itemtype": _MICRODATA_JOB_TYPE})
+    if scope is None:
+        return None
+    return _job(
+        _itemprop_value(scope.find(attrs={"itemprop": "title"})),
+        _itemprop_value(scope.find(attrs={"itemprop": "description"})),
+    )
+
+
+def open_graph_tags(page_html):
+    """Return the og: meta properties of the page head."""
+    head_end = _HEAD_END.search(page_html)
+    head = page_html[: head_end.start()] if head_end else page_html
+    tags = {}
+    for meta in _META_TAG.findall(head):
+        attributes = {
+            name.lower(): value.strip("\"'")
+            for name, value in _ATTRIBUTE.findall(meta)
+        }
+        key = attributes.get("property") or attributes.get("name") or ""
+        if key.lower().startswith("og:") and "content" in attributes:
+            tags.setdefault(key.lower(), html.unescape(attributes["content"]))
+    return tags
+
+
+def extract_open_graph(page_html):
+    """
+    Return the job described by the page's OpenGraph tags, or None when the
+    description is too short to be more than a teaser.
+    """
+    tags = open_graph_tags(page_html)
+    job = _job(tags.get("og:title"), tags.get("og:description"))
+    if job and len(job["Job Description"].split()) >= MIN_OPEN_GRAPH_WORDS:
+        return job
+    return None
+
+
+def _heuristic_fields(fields):
+    if not fields["description"]:
+        return None
+    return {
+        "Job Title": fields["title"],
+        "Job Description": fields["description"],
+    }
+
+
+class JobExtractor:
+    def __init__(self, soup_factory=make_soup):
+        """
+        Initialise the extractor. `soup_factory(html)` builds the soup
+        microdata is read from.
+        """
+        self.soup_factory = soup_factory
+        self.stats = {
+            strategy: {"attempts": 0, "hits": 0, "seconds": 0.0}
+            for strategy in STRATEGIES
+        }
+        self._lock = threading.Lock()
+
+    def _run(self, strategy, function, argument):
+        started = time.perf_counter()
+        job = function(argument)
+        with self._lock:
+            stats = self.stats[strategy]
+            stats["attempts"] += 1
+            stats["hits"] += bool(job)
+            stats["seconds"] += time.perf_counter() - started
+        return job
+
+    def from_html(self, page_html):
+        """
+        Return the job from the page's structured data, or None. Tried in
+        order: JSON-LD, microdata, OpenGraph.
+        """
+        job = self._run(JSON_LD, extract_json_ld, page_html)
+        if not job and _MICRODATA_JOB.search(page_html):
+            job = self._run(
+                MICRODATA,
+                extract_microdata,
+                self.soup_factory(page_html),
+            )
+        if not job:
+            job = self._run(OPEN_GRAPH, extract_open_graph, page_html)
+        return job
+
+    def from_fields(self, fields):
+        """
+        Return the job in the fields `BrowserExtractor.job_fields` read from
+        a rendered page, or None. Structured data is tried first, then the
+        title and largest text block found in the browser.
+        """
+        job = self.from_html(fields["structured_html"])
+        if not job:
+            job = self._run(HEURISTIC, _heuristic_fields, fields)
+        return job
+
+    def from_soup(self, soup):
+        """Return the job `heuristic_scrape` finds in the soup, or None."""
+        return self._run(HEURISTIC, heuristic_scrape, soup)
+
+    def report(self):
+        """Return the hit rate and mean time of every strategy tried."""
+        with self._lock:
+            stats = {
+                strategy: dict(entry) for strategy, entry in self.stats.items()
+            }
+        report = {}
+        for strategy, entry in stats.items():
+            if not entry["attempts"]:
+                continue
+            entry["hit_rate"] = entry["hits"] / entry["attempts"]
+            entry["mean_ms"] = entry["seconds"] / entry["attempts"] * 1000
+            report[strategy] = entry
+        return report
+
+    def print_report(self):
+        """Print the extraction report."""
+        for strategy, entry in self.report().items():
+            print(
+                f"{strategy}: {entry['hits']}/{entry['attempts']} jobs found "
+                f"({entry['hit_rate']:.0%}), {entry['mean_ms']:.1f}ms on average"
+            )
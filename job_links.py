@@ -0,0 +1,210 @@
+"""Canonical job URLs and the job pages already visited.
+
+The links of a jobs index are made absolute, then canonicalised before any
+page is fetched: the scheme and host are lowercased, default ports,
+fragments and tracking parameters are dropped and the remaining query
+parameters are sorted. Links that cannot be job pages, such as mail links,
+assets or the index page itself, are dropped. Every job page visited is
+remembered across runs, so postings seen before are not rendered again.
+
+The store also keeps a digest of the job URLs each company listed last,
+so a re-crawl can skip a listing that did not change, and tells which
+postings stopped or started being listed again since.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+DEFAULT_SEEN_LINKS_PATH = ".seen_job_links.sqlite"
+
+TRACKING_PARAMS = {
+    "_ga",
+    "_gl",
+    "dclid",
+    "fbclid",
+    "gclid",
+    "gh_src",
+    "igshid",
+    "lever-origin",
+    "lever-source",
+    "mc_cid",
+    "mc_eid",
+    "msclkid",
+    "yclid",
+}
+TRACKING_PREFIXES = ("utm_", "mtm_", "pk_", "hsa_")
+
+ASSET_EXTENSIONS = (
+    ".css",
+    ".gif",
+    ".ico",
+    ".jpeg",
+    ".jpg",
+    ".js",
+    ".mp4",
+    ".png",
+    ".svg",
+    ".webp",
+    ".zip",
+)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonical_url(url):
+    """Return the canonical form of an absolute http(s) URL, or None."""
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parsed.hostname:
+        return None
+
+    netloc = parsed.hostname.lower()
+    try:
+        port = parsed.port
+    except ValueError:
+        return None
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS
+        and not name.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunparse(
+        (scheme, netloc, parsed.path or "/", parsed.params, urlencode(query), "")
+    )
+
+
+def canonical_job_url(url, index_url):
+    """
+    Return the canonical form of a link found on the jobs index at
+    `index_url`, or None when it cannot be a job page.
+    """
+    if not url:
+        return None
+    url = canonical_url(url)
+    if url is None or url == canonical_url(index_url):
+        return None
+    if urlparse(url).path.lower().endswith(ASSET_EXTENSIONS):
+        return None
+    return url
+
+
+def listing_digest(urls):
+    """Return a digest of the job URLs a company lists, in any order."""
+    return hashlib.sha256("\n".join(sorted(set(urls))).encode()).hexdigest()
+
+
+class SeenJobLinks:
+    def __init__(self, path=DEFAULT_SEEN_LINKS_PATH):
+        """Open the store of visited job pages, creating it if needed."""
+        self.path = path
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS seen (
+                    url TEXT PRIMARY KEY,
+                    website TEXT,
+                    first_seen REAL NOT NULL,
+                    closed_at REAL
+                )
+                """
+            )
+            columns = {
+                row[1]
+                for row in self.connection.execute("PRAGMA table_info(seen)")
+            }
+            if "closed_at" not in columns:
+                self.connection.execute("ALTER TABLE seen ADD COLUMN closed_at REAL")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS seen_website ON seen (website)"
+            )
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS listings (
+                    website TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def __contains__(self, url):
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM seen WHERE url = ?",
+                (url,),
+            ).fetchone()
+        return row is not None
+
+    def add(self, url, website):
+        """Remember that the job page at `url` of `website` was visited."""
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO seen (url, website, first_seen) "
+                "VALUES (?, ?, ?)",
+                (url, website, time.time()),
+            )
+
+    def last_listing_digest(self, website):
+        """Return the digest of the job URLs `website` listed last, or None."""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT digest FROM listings WHERE website = ?",
+                (website,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record_listing(self, website, digest):
+        """Remember the digest of the job URLs `website` lists now."""
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?, ?)",
+                (website, digest, time.time()),
+            )
+
+    def listing_changes(self, website, urls):
+        """
+        Compare the job URLs `website` lists now with the pages of it
+        visited before. Return (closed, reopened): the visited pages that
+        are no longer listed, and the closed ones listed again.
+        """
+        urls = set(urls)
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT url, closed_at FROM seen WHERE website = ?",
+                (website,),
+            ).fetchall()
+        closed = [
+            url for url, closed_at in rows
+            if closed_at is None and url not in urls
+        ]
+        reopened = [
+            url for url, closed_at in rows
+            if closed_at is not None and url in urls
+        ]
+        return closed, reopened
+
+    def apply_listing_changes(self, closed, reopened):
+        """Remember the changes `listing_changes` found."""
+        now = time.time()
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "UPDATE seen SET closed_at = ? WHERE url = ?",
+                [(now, url) for url in closed],
+            )
+            self.connection.executemany(
+                "UPDATE seen SET closed_at = NULL WHERE url = ?",
+                [(url,) for url in reopened],
+            )
+
+    def close(self):
+        """Close the store."""
+        with self._lock:
+            self.connection.close()
@@ -0,0 +1,242 @@
+"""Append-only storage for scraped jobs.
+
+A sink keeps an in-memory index of the dedup keys (website, job URL, job
+title) of every job it holds, built once when it is opened, and appends new
+jobs in batches. Adding a job never re-reads or rewrites what is already
+stored, so the cost of a run grows with the number of new jobs only.
+
+Every job has a Status, open until the posting disappears from its
+company's listing. The SQLite sink applies status changes in place at once.
+The CSV sink applies them in one rewrite when it closes, and journals them
+until then, so changes a killed run never applied are applied when the
+sink is opened again.
+"""
+import csv
+import json
+import os
+import sqlite3
+import threading
+
+JOB_COLUMNS = ["Website", "Job URL", "Job Title", "Job Description", "Status"]
+
+OPEN = "open"
+CLOSED = "closed"
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+def dedup_key(row):
+    """Return the key two rows must share to count as the same job."""
+    return tuple(str(row.get(column) or "") for column in JOB_COLUMNS[:3])
+
+
+class JobSink:
+    def __init__(self, path, batch_size=50):
+        """Open the sink and index the jobs it already holds."""
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer = []
+        self._statuses = {}
+        self._lock = threading.Lock()
+        self._keys = set(self._load_keys())
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, row):
+        return dedup_key(row) in self._keys
+
+    def add(self, row):
+        """
+        Queue a job for writing. Return False if the sink already holds
+        the same job.
+        """
+        key = dedup_key(row)
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            row = {column: row.get(column) for column in JOB_COLUMNS}
+            row["Status"] = row["Status"] or OPEN
+            self._buffer.append(row)
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+        return True
+
+    def set_status(self, website, urls, status):
+        """Queue a status change for the jobs of `website` at `urls`."""
+        with self._lock:
+            for url in urls:
+                self._statuses[(website, url)] = status
+
+    def flush(self):
+        """Write the queued jobs."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self._write_rows(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        """Write the queued jobs and release the storage."""
+        self.flush()
+
+    def _load_keys(self):
+        raise NotImplementedError
+
+    def _write_rows(self, rows):
+        raise NotImplementedError
+
+
+class CsvJobSink(JobSink):
+    def __init__(self, path, batch_size=50):
+        """
+        Open the sink, adding the Status column to a file written before
+        it existed and applying the status changes a previous run left in
+        the journal.
+        """
+        super().__init__(path, batch_size)
+        self.journal_path = path + ".statuses"
+        self._statuses = dict(self._load_journal())
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, newline="", encoding="utf-8") as csv_file:
+                header = next(csv.reader(csv_file), [])
+            if header != JOB_COLUMNS or self._statuses:
+                self._rewrite(self._statuses)
+        self._statuses = {}
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def _load_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    website, url, status = json.loads(line)
+                except ValueError:
+                    # A line cut short by a killed run
+                    continue
+                yield (website, url), status
+
+    def set_status(self, website, urls, status):
+        """
+        Queue a status change for the jobs of `website` at `urls`, recorded
+        in the journal before this returns.
+        """
+        urls = list(urls)
+        if not urls:
+            return
+        with self._lock:
+            with open(self.journal_path, "a", encoding="utf-8") as journal:
+                for url in urls:
+                    journal.write(json.dumps([website, url, status]) + "\n")
+                    self._statuses[(website, url)] = status
+
+    def _load_keys(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, newline="", encoding="utf-8") as csv_file:
+            for row in csv.DictReader(csv_file):
+                yield dedup_key(row)
+
+    def _rewrite(self, statuses):
+        temporary_path = self.path + ".tmp"
+        with open(self.path, newline="", encoding="utf-8") as csv_file, open(
+            temporary_path, "w", newline="", encoding="utf-8"
+        ) as new_file:
+            writer = csv.DictWriter(
+                new_file,
+                fieldnames=JOB_COLUMNS,
+                extrasaction="ignore",
+            )
+            writer.writeheader()
+            for row in csv.DictReader(csv_file):
+                status = statuses.get((row["Website"], row["Job URL"]))
+                row["Status"] = status or row.get("Status") or OPEN
+                writer.writerow(row)
+        os.replace(temporary_path, self.path)
+
+    def close(self):
+        """Write the queued jobs, then apply the queued status changes."""
+        with self._lock:
+            self._flush()
+            if self._statuses and os.path.exists(self.path):
+                self._rewrite(self._statuses)
+            self._statuses = {}
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+
+    def _write_rows(self, rows):
+        write_header = (
+            not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        )
+        with open(self.path, "a", newline="", encoding="utf-8") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=JOB_COLUMNS)
+            if write_header:
+                writer.writeheader()
+            writer.writerows(rows)
+
+
+class SqliteJobSink(JobSink):
+    def __init__(self, path, batch_size=50):
+        """Open the database, creating the jobs table if needed."""
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                website TEXT NOT NULL,
+                job_url TEXT NOT NULL,
+                job_title TEXT NOT NULL,
+                job_description TEXT,
+                status TEXT NOT NULL DEFAULT 'open',
+                UNIQUE (website, job_url, job_title)
+            )
+            """
+        )
+        columns = {
+            row[1] for row in self.connection.execute("PRAGMA table_info(jobs)")
+        }
+        if "status" not in columns:
+            with self.connection:
+                self.connection.execute(
+                    "ALTER TABLE jobs ADD COLUMN status TEXT NOT NULL DEFAULT 'open'"
+                )
+        super().__init__(path, batch_size)
+
+    def _load_keys(self):
+        return self.connection.execute(
+            "SELECT website, job_url, job_title FROM jobs"
+        )
+
+    def _write_rows(self, rows):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO jobs VALUES (?, ?, ?, ?, ?)",
+                [
+                    (*dedup_key(row), row["Job Description"], row["Status"])
+                    for row in rows
+                ],
+            )
+
+    def set_status(self, website, urls, status):
+        """Set the status of the jobs of `website` at `urls`."""
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "UPDATE jobs SET status = ? WHERE website = ? AND job_url = ?",
+                [(status, website, url) for url in urls],
+            )
+
+    def close(self):
+        """Write the queued jobs and close the database."""
+        super().close()
+        self.connection.close()
+
+
+def open_job_sink(path, batch_size=50):
+    """Open a SQLite sink for .db/.sqlite paths and a CSV sink otherwise."""
+    if path.lower().endswith(SQLITE_EXTENSIONS):
+        return SqliteJobSink(path, batch_size)
+    return CsvJobSink(path, batch_size)
@@ -0,0 +1,219 @@
+"""Keyword matching and ranking for link classification.
+
+Keywords are folded (lowercased, and for link texts punctuation folded to
+spaces) and compiled once into a single regex alternation. Ranking a page
+scans all of its hrefs, or all of its link texts, in one regex pass over
+their lowercased concatenation, and only the links that pass are folded
+and scored. Links are scored rather than returned on the first hit, and the
+best scoring link wins.
+"""
+import re
+from bisect import bisect_right
+from itertools import accumulate
+
+TEXT = "text"
+HREF = "href"
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+# Score of each kind of evidence a link can carry
+EXACT_TEXT_SCORE = 8
+TEXT_PHRASE_SCORE = 4
+HREF_SCORE = 2
+
+# Link texts longer than this are sentences, not buttons
+MAX_BUTTON_WORDS = 8
+
+SKIPPED_HREF_PREFIXES = ("mailto:", "tel:", "javascript:")
+
+
+def normalise(text):
+    """Lowercase the text and fold punctuation and whitespace to spaces."""
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def trie_alternation(words):
+    """
+    Return a regex matching any of `words`, factored by common prefixes so
+    the engine tries one branch per character rather than every word.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _trie_pattern(trie)
+
+
+def _trie_pattern(node):
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    # A word ending here may also be the prefix of longer ones
+    return f"(?:{pattern})?" if "" in node else pattern
+
+
+class KeywordMatcher:
+    def __init__(self, keywords, whole_words=True, fold=normalise):
+        """
+        Compile the keywords into one pattern. With `whole_words` a keyword
+        only matches whole words of the text, otherwise any substring.
+        `fold` is applied to the keywords, and is expected to have been
+        applied to the texts searched.
+        """
+        folded = {fold(keyword) for keyword in keywords}
+        folded.discard("")
+        self.keywords = folded
+        # Longest first, so the alternation prefers the most specific match
+        alternation = "|".join(
+            re.escape(keyword)
+            for keyword in sorted(folded, key=len, reverse=True)
+        )
+        if whole_words:
+            alternation = rf"\b(?:{alternation})\b"
+        self.pattern = re.compile(alternation) if folded else None
+        # A whole word match needs the first word of its keyword in the
+        # text, a set test that rules out most texts before the regex runs
+        self.first_words = (
+            {keyword.split()[0] for keyword in folded} if whole_words else None
+        )
+        # What a lowercased, unfolded text must contain to possibly match:
+        # the first word of a keyword as a word, or a keyword as a substring
+        self.whole_words = whole_words
+        if not folded:
+            self.scan_pattern = None
+        elif whole_words:
+            self.scan_pattern = re.compile(
+                rf"\b{trie_alternation(self.first_words)}\b"
+            )
+        else:
+            self.scan_pattern = re.compile(trie_alternation(folded))
+
+    def is_exact(self, folded_text):
+        """Return whether the folded text is exactly one keyword."""
+        return folded_text in self.keywords
+
+    def search(self, folded_text):
+        """Return the first keyword found in the folded text, or None."""
+        if self.pattern is None:
+            return None
+        if self.first_words is not None and self.first_words.isdisjoint(
+            folded_text.split()
+        ):
+            return None
+        match = self.pattern.search(folded_text)
+        return match.group(0) if match else None
+
+    def candidates(self, texts):
+        """
+        Return the indices of the texts that may contain a keyword, found
+        in one scan of all the texts lowercased.
+        """
+        if self.scan_pattern is None:
+            return set()
+        # The separator is no word and in no keyword, so no match spans it
+        joined = "\n".join(texts)
+        lowered = joined.lower()
+        if len(lowered) != len(joined):
+            # Some characters lowercase to several, shifting the offsets
+            texts = [text.lower() for text in texts]
+            lowered = "\n".join(texts)
+        if self.whole_words:
+            # Folding makes underscores word boundaries, unlike \b
+            lowered = lowered.replace("_", " ")
+        starts = list(accumulate((len(text) + 1 for text in texts), initial=0))
+        return {
+            bisect_right(starts, match.start()) - 1
+            for match in self.scan_pattern.finditer(lowered)
+        }
+
+
+class LinkScorer:
+    def __init__(self, text_keywords, href_keywords):
+        """
+        Compile the keywords looked for in link texts, as whole words, and
+        in lowercased hrefs, as substrings.
+        """
+        self.text_matcher = KeywordMatcher(text_keywords)
+        self.href_matcher = KeywordMatcher(
+            href_keywords,
+            whole_words=False,
+            fold=str.lower,
+        )
+
+    def text_score(self, text):
+        """
+        Score a link text. An exact keyword text beats a keyword phrase
+        inside a short text.
+        """
+        text = normalise(text or "")
+        if self.text_matcher.is_exact(text):
+            return EXACT_TEXT_SCORE
+        if (
+            len(text.split()) <= MAX_BUTTON_WORDS
+            and self.text_matcher.search(text) is not None
+        ):
+            return TEXT_PHRASE_SCORE
+        return 0
+
+    def href_score(self, href):
+        """Score a link href."""
+        return HREF_SCORE if self.href_matcher.search(href.lower()) else 0
+
+    def score(self, text, href):
+        """Return (text score, href score) for a link."""
+        return self.text_score(text), self.href_score(href or "")
+
+    def rank(self, anchors, require=None):
+        """
+        Return the hrefs of the (text, href) pairs that match, best first.
+        `require` is TEXT or HREF to keep only links matching there. Ties
+        keep document order.
+        """
+        anchors = list(anchors)
+        # Most links match nowhere; scan them all at once to find the few
+        # worth folding and scoring
+        positions = set()
+        if require != TEXT:
+            positions |= self.href_matcher.candidates(
+                [href or "" for _, href in anchors]
+            )
+        if require != HREF:
+            positions |= self.text_matcher.candidates(
+                [text or "" for text, _ in anchors]
+            )
+
+        scored = []
+        for position in positions:
+            text, href = anchors[position]
+            if not href or href.lower().startswith(SKIPPED_HREF_PREFIXES):
+                continue
+            text_score, href_score = self.score(text, href)
+            if (require == TEXT and not text_score) or (
+                require == HREF and not href_score
+            ):
+                continue
+            score = text_score + href_score
+            if score:
+                scored.append((-score, position, href))
+        scored.sort()
+        return [href for _, _, href in scored]
+
+    def best(self, anchors, require=None):
+        """Return the best matching href, or None."""
+        ranked = self.rank(anchors, require)
+        return ranked[0] if ranked else None
+
+
+def anchors_from_soup(soup):
+    """Return (text, href) for every link of a soup."""
+    return [
+        (anchor.get_text(" "), anchor.get("href"))
+        for anchor in soup.find_all("a")
+    ]
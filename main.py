@@ -1,37 +1,172 @@
-import os
-import re
+import argparse
+import copy
+import itertools
 import time
-from urllib.parse import urlparse, urlunparse
-
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-from requests.exceptions import ConnectionError, Timeout
-from selenium.webdriver import Firefox, FirefoxOptions
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-
+from urllib.parse import urljoin, urlparse, urlunparse
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver import Firefox
+
+from accounts import iter_accounts
+from ats_connectors import CONNECTORS, AtsConnectors
+from browser_extraction import BrowserExtractor, NotExtractable
+from browser_profile import DEFAULT_PAGE_LOAD_TIMEOUT, browser_options
+from career_discovery import CareerPageDiscovery
+from checkpoint import (
+    CAREER_LINK_FOUND,
+    DONE,
+    FINISHED_STATUSES,
+    NO_CAREER_PAGE,
+    CheckpointStore,
+)
+from consent import ALREADY_ACCEPTED, FAILED, NO_BANNER, ConsentHandler
+from dns_resolver import AsyncResolver
+from frontier import CAREER_PAGE, HOMEPAGE, JOB, JOBS_INDEX, STAGE_NAMES, Frontier
 from get_links import keywords_list  # External file for keywords
-from job_description_n_job_title import heuristic_scrape
-from utils import (
-    extract_content_from_tag,
-    find_all_pattern_matches,
-    find_div_structure,
+from html_parsing import available_parsers, clean_soup, default_parser, make_soup
+from http_cache import DEFAULT_CACHE_PATH, ResponseCache, build_session
+from instrumentation import (
+    ATS_FEED,
+    COOKIES,
+    DISCOVERY,
+    FETCH,
+    HTTP_FETCH,
+    JOB_SCRAPING,
+    NAVIGATION,
+    PARSE,
+    WRITE,
+    Instrumentation,
+    extraction_stage,
+)
+from job_extraction import JobExtractor
+from job_links import (
+    DEFAULT_SEEN_LINKS_PATH,
+    SeenJobLinks,
+    canonical_job_url,
+    canonical_url,
+    listing_digest,
+)
+from job_sink import CLOSED, OPEN, open_job_sink
+from keyword_matcher import HREF, TEXT, LinkScorer, anchors_from_soup
+from managed_driver import (
+    DEFAULT_MAX_PAGES,
+    DEFAULT_MAX_RSS,
+    DriverStats,
+    ManagedDriver,
+    NavigationTimeout,
+)
+from negative_cache import DEFAULT_NEGATIVE_CACHE_PATH, NegativeCache
+from page_load import MODES, PageLoadStrategy
+from tiered_fetch import (
+    BROWSER_TIER,
+    HTTP_TIER,
+    HttpFetcher,
+    TierLog,
+    looks_js_rendered,
 )
+from utils import StructureIndex, extract_content_from_tag
+from worker_pool import run_worker_pool
 
 # Constants
 INPUT_CSV_PATH = "apollo-accounts-export.csv"
 CAREERS = "careers/"
 
+# Words a career page URL usually contains
+CAREER_URL_KEYWORDS = [
+    "career",
+    "careers",
+    "employment",
+    "opportunities",
+    "vacancies",
+    "recruitment",
+    "hiring",
+    "work",
+    "join-us",
+    "job-listings",
+    "jobs",
+]
+
+# Consent outcomes where nothing was clicked
+NOT_CLICKED = {ALREADY_ACCEPTED, FAILED, NO_BANNER}
+
+# Seconds past the page-load timeout before a navigation counts as hung
+NAVIGATION_GRACE = 30
+
 
 class JobsScrapperCrunchbase:
-    def __init__(self, input_csv_path, keywords_list):
-        """Initialise the scrapper class."""
+    def __init__(
+        self,
+        input_csv_path,
+        keywords_list,
+        http_cache_path=DEFAULT_CACHE_PATH,
+        negative_cache_path=DEFAULT_NEGATIVE_CACHE_PATH,
+        ats_api_bases=None,
+        seen_links_path=DEFAULT_SEEN_LINKS_PATH,
+        events_path=None,
+    ):
+        """
+        Initialise the scrapper class. Plain HTTP requests share one pooled
+        session, cached at `http_cache_path` unless it is None. Dead career
+        page candidates are remembered at `negative_cache_path`, and job
+        pages already visited at `seen_links_path`, or for this run only
+        when it is None.
+        `ats_api_bases` overrides the API base of ATS connectors by name.
+        Stage timings are written to `events_path` as JSON lines unless it
+        is None.
+        """
         self.driver = None
         self.input_csv_path = input_csv_path
         self.output_csv_path = "jobs.csv"
         self.keywords_list = keywords_list
+        self.link_scorer = LinkScorer(
+            text_keywords=keywords_list,
+            href_keywords=CAREER_URL_KEYWORDS,
+        )
+        self.http_cache = ResponseCache(http_cache_path) if http_cache_path else None
+        self.http_session = build_session(cache=self.http_cache)
+        self.negative_cache = NegativeCache(negative_cache_path)
+        self.instrumentation = Instrumentation(events_path)
+        self.seen_job_links = SeenJobLinks(seen_links_path or ":memory:")
+        self.frontier = Frontier()
+        self.career_discovery = CareerPageDiscovery(
+            session=self.http_session,
+            negative_cache=self.negative_cache,
+            resolver=AsyncResolver(),
+            frontier=self.frontier,
+            instrumentation=self.instrumentation,
+        )
+        self.page_load = PageLoadStrategy()
+        self.http_fetcher = HttpFetcher(session=self.http_session)
+        self.ats_connectors = AtsConnectors(
+            self.http_session,
+            ats_api_bases,
+            frontier=self.frontier,
+        )
+        self.tier_log = TierLog()
+        self.html_parser = default_parser()
+        self.job_extractor = JobExtractor(soup_factory=self.html_to_soup_obj)
+        self.browser_extractor = BrowserExtractor()
+        self.browser_extraction = True
+        self.consent = ConsentHandler()
+        self.job_sink = None
+        self.checkpoint = None
+        self.incremental = False
+        self.headless = True
+        self.lightweight_browser = True
+        self.page_load_timeout = DEFAULT_PAGE_LOAD_TIMEOUT
+        self.browser_max_pages = DEFAULT_MAX_PAGES
+        self.browser_max_rss = DEFAULT_MAX_RSS
+        self.driver_stats = DriverStats()
+
+    def clone_for_worker(self):
+        """
+        Return a scrapper for a pool worker. The clone gets its own browser
+        but shares every other component, such as the output sink, the
+        discovery engine and the HTTP tier, with this one.
+        """
+        worker = copy.copy(self)
+        worker.driver = None
+        return worker
 
     # Utility Methods
     def seconds_to_structured_format_time(self, secs):
@@ -40,194 +175,192 @@ class JobsScrapperCrunchbase:
         return time.strftime("%H:%M:%S", gmt_format)
 
     # Browser Configuration
-    def configure_browser(self):
-        """Configure the browser settings."""
-        firefox_options = FirefoxOptions()
-        # firefox_options.add_argument("--headless")
-        # firefox_options.add_argument("--no-sandbox")
-        firefox_options.add_argument("--log-level=3")
-        firefox_options.add_argument("--disable-dev-shm-usage")
-        firefox_options.add_argument("--disable-extensions")
-        firefox_options.add_argument("--disable-gpu")
-        firefox_options.add_argument("start-maximized")
-        firefox_options.add_argument(
-            "--disable-blink-features=AutomationControlled"  # noqa
+    def configure_browser(self, headless=None):
+        """
+        Set up Firefox, headless unless told otherwise, with the lightweight
+        profile unless it was turned off, and bound the time a page may take
+        to load. The browser is replaced after `browser_max_pages` pages,
+        above `browser_max_rss` bytes, or when a navigation hangs.
+        """
+        if headless is None:
+            headless = self.headless
+        firefox_options = browser_options(
+            headless=headless,
+            lightweight=self.lightweight_browser,
+        )
+        # Waits must not hold out for the subresources navigation skipped
+        self.page_load.eager = firefox_options.page_load_strategy == "eager"
+
+        def start_firefox():
+            driver = Firefox(options=firefox_options)
+            driver.set_page_load_timeout(self.page_load_timeout)
+            return driver
+
+        self.driver = ManagedDriver(
+            start_firefox,
+            max_pages=self.browser_max_pages,
+            max_rss=self.browser_max_rss,
+            navigation_timeout=self.page_load_timeout + NAVIGATION_GRACE,
+            stats=self.driver_stats,
         )
-        firefox_options.add_argument("--disable-infobars")
-        self.driver = Firefox(options=firefox_options)
-
-    # Page Interactions
-    def open_url_in_driver(self, url):
-        """Open URL in the selenium driver."""
-        try:
-            self.driver.get(url)
-            time.sleep(3)
-        except Exception:
-            self.driver.refresh()
 
-    def accept_cookies(self):
-        # wait until popup loads
-        time.sleep(3)
+    def restart_browser(self, headless=None):
+        """Quit the current browser, if any, and start a fresh one."""
+        self.quit_browser()
+        self.configure_browser(headless=headless)
 
-        # try to click directly if button is available
-        try:
-            self.driver.find_element(
-                By.XPATH, "//*[contains(text(), 'Accept')]"
-            ).click()
+    def quit_browser(self):
+        """Quit the browser, ignoring a driver that already crashed."""
+        if self.driver is None:
             return
+        try:
+            self.driver.quit()
         except Exception:
-            ...
-
-        time.sleep(1)
-        soup_obj = self.selenium_driver_obj_to_soup_obj()
-
-        def tag_name_to_text_getter(tag_names):
-            """
-            Helper function to get the texts of the based on the given tags list
-            """
-            for tag_name in tag_names:
-                tags_list = soup_obj.find_all(tag_name)
-                buttons_text = [tag.text for tag in tags_list if "Accept" in tag.text]
-                if buttons_text:
-                    button_text = buttons_text[0].replace("\n", "").strip()
-                    return button_text
-
-        button_tag_names = ["a", "button"]
-
-        button_text = tag_name_to_text_getter(button_tag_names)
-        if button_text:
+            pass
+        self.driver = None
+
+    # Page Interactions
+    def open_url_in_driver(self, url):
+        """Open URL in the selenium driver and wait until it is ready."""
+        with self.instrumentation.stage(NAVIGATION, url=url) as event:
             try:
-                self.driver.find_element(
-                    By.XPATH, f"//*[contains(text(), '{button_text}')]"
-                ).click()
-                time.sleep(3)
+                self.driver.get(url)
+            except TimeoutException:
+                # Keep what has loaded, the DOM is usually there already
+                self.driver.execute_script("window.stop();")
+            except NavigationTimeout as e:
+                # The hung browser was replaced, the page is left blank
+                print(f"Navigation to {url} hung: {e}")
             except Exception:
-                pass
+                self.driver.refresh()
+            self.page_load.wait_for_page(self.driver, url, "navigation", event)
+
+    def accept_cookies(self):
+        """Dismiss the cookie banner, logging the time it took."""
+        started = time.perf_counter()
+        url = self.driver.current_url
+        try:
+            with self.instrumentation.stage(COOKIES, url=url) as event:
+                event["outcome"] = self.consent.dismiss(self.driver, url)
+                if event["outcome"] not in NOT_CLICKED:
+                    self.page_load.wait_for_page(self.driver)
+        finally:
+            self.page_load.record(url, "cookies", time.perf_counter() - started)
 
     def selenium_driver_obj_to_soup_obj(self, do_clean=False):
         """Convert Selenium driver object to BeautifulSoup object."""
-        page_source = self.driver.page_source
-        soup_object = BeautifulSoup(page_source, "html.parser")
-        if do_clean:
-            soup_object = self.clean_html(soup_object)
-        return soup_object
+        return self.html_to_soup_obj(self.driver.page_source, do_clean)
+
+    def html_to_soup_obj(self, html, do_clean=False):
+        """Convert an HTML string to BeautifulSoup object."""
+        with self.instrumentation.stage(PARSE):
+            return make_soup(html, self.html_parser, do_clean)
+
+    def timed_extract(self, stage, extract, argument):
+        """Run `extract(argument)` on a page fetched as `stage`, timed."""
+        with self.instrumentation.stage(extraction_stage(STAGE_NAMES[stage])):
+            return extract(argument)
+
+    def fetch_page(
+        self,
+        url,
+        extract,
+        stage,
+        do_clean=False,
+        accept_cookies=False,
+        extract_html=None,
+        extract_in_browser=None,
+    ):
+        """
+        Fetch a page and run `extract` on its soup. Plain HTTP is tried
+        first and the browser is used only when the HTML looks JS-rendered
+        or `extract` finds nothing in it. `extract_html`, if given, is run
+        on the raw HTML first, and no soup is built when it finds something.
+        In the browser, `extract_in_browser(do_clean)` replaces both unless
+        it raises NotExtractable, so the page source is not transferred.
+        Both tiers wait for a slot on the host in the frontier, queued as
+        `stage`. The fetch is timed, with the tier that served the page.
+        Return the final URL of the page and what was extracted.
+        """
+        with self.instrumentation.stage(FETCH, url=url) as event:
+            with self.frontier.slot(url, stage):
+                with self.instrumentation.stage(HTTP_FETCH, url=url):
+                    response = self.http_fetcher.get(url)
+            if response is None:
+                reason = "http_error"
+            else:
+                if extract_html is not None:
+                    result = self.timed_extract(stage, extract_html, response.text)
+                    if result:
+                        self.record_tier(event, url, HTTP_TIER)
+                        return response.url, result
+                soup_obj = self.html_to_soup_obj(response.text)
+                reason = looks_js_rendered(soup_obj)
+                if not reason:
+                    if do_clean:
+                        soup_obj = self.clean_html(soup_obj)
+                    result = self.timed_extract(stage, extract, soup_obj)
+                    if result:
+                        self.record_tier(event, url, HTTP_TIER)
+                        return response.url, result
+                    reason = "nothing_extracted"
+
+            with self.frontier.slot(url, stage):
+                self.open_url_in_driver(url)
+                if accept_cookies:
+                    self.accept_cookies()
+                in_browser = extract_in_browser is not None and self.browser_extraction
+                if in_browser:
+                    try:
+                        result = self.timed_extract(stage, extract_in_browser, do_clean)
+                    except NotExtractable as e:
+                        print(f"Reading the page source of {url}: {e}")
+                        in_browser = False
+                if not in_browser:
+                    html = self.driver.page_source
+            if not in_browser:
+                result = None
+                if extract_html is not None:
+                    result = self.timed_extract(stage, extract_html, html)
+                if not result:
+                    soup_obj = self.html_to_soup_obj(html, do_clean)
+                    result = self.timed_extract(stage, extract, soup_obj)
+            self.record_tier(event, url, BROWSER_TIER, reason)
+            return self.driver.current_url, result
+
+    def record_tier(self, event, url, tier, reason=None):
+        """
+        Count the page at `url` as served by `tier`, on the fetch `event`
+        too. For the browser `reason` says why the HTTP tier was not used.
+        """
+        self.tier_log.record(url, tier, reason)
+        self.instrumentation.count_page()
+        event["tier"] = tier
+        event["fallback_reason"] = reason
 
     def find_career_page(self, domain, soup):
-        keywords = [
-            "career",
-            "careers",
-            "employment",
-            "opportunities",
-            "vacancies",
-            "recruitment",
-            "hiring",
-            "work",
-            "join-us",
-            "job-listings",
-            "jobs",
-        ]
+        career_link = self.find_career_link_in_soup(soup)
+        if career_link:
+            return career_link
+        return self.career_discovery.discover(domain)
 
-        for link in soup.find_all("a"):
-            for keyword in keywords:
-                if keyword in link["href"]:
-                    return link["href"]
-
-        headers = {
-            "User-Agent": "Googlebot/2.1 (+http://www.google.com/bot.html)",
-        }
-
-        # Check if 'careers' is a subdomain
-        parsed_url = urlparse(domain)
-        for subdomain in [
-            "careers",
-            "recruitment",
-            "jobs",
-            "employment",
-            "opportunities",
-            "vacancies",
-            "hiring",
-            "join",
-            "work",
-            "jobboard",
-        ]:
-            career_subdomain = f"https://{subdomain}.{parsed_url.netloc}"
+    def find_career_link_in_soup(self, soup):
+        """Return the best link whose href looks like a career page."""
+        return self.link_scorer.best(anchors_from_soup(soup), require=HREF)
 
-            try:
-                response = requests.get(
-                    career_subdomain,
-                    headers=headers,
-                    timeout=10,
-                )
-                if response.status_code == 200:
-                    return career_subdomain
-            except (ConnectionError, Timeout):
-                ...
-                # print(f"Failed to connect to {career_subdomain}")
-
-        # Check common career paths
-        career_paths = [
-            "/careers",
-            "/jobs",
-            "/career",
-            "/employment",
-            "/opportunities",
-            "/join-us",
-            "/work-with-us",
-            "/vacancies",
-            "/job-openings",
-            "/recruitment",
-            "/hiring",
-            "/work-for-us",
-            "/job-listings",
-            "/career-opportunities",
-            "/job-search",
-        ]
-        for path in career_paths:
-            url = self.build_complete_link(domain, path)
-            try:
-                response = requests.get(
-                    url,
-                    headers=headers,
-                    timeout=10,
-                )
-                if response.status_code == 200:
-                    return url
-            except Exception as e:
-                print(e)
-                return None
+    def get_job_link_from_button(self, soup):
+        """Return the best link whose text looks like a jobs button."""
+        return self.link_scorer.best(anchors_from_soup(soup), require=TEXT)
 
-        # Check sitemap
-        sitemap_paths = [
-            "/sitemap.xml",
-            "/sitemap_index.xml",
-        ]
-        for sitemap_path in sitemap_paths:
-            sitemap_url = self.build_complete_link(domain, sitemap_path)
-            response = requests.get(sitemap_url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "xml")
-                urls = soup.find_all("loc")
-                for url in urls:
-                    if any(
-                        keyword in url.text
-                        for keyword in [
-                            "career",
-                            "job",
-                            "employment",
-                            "opportunity",
-                        ]
-                    ):
-                        return url.text
-
-        return None
+    def find_career_link_in_browser(self, do_clean=False):
+        """`find_career_link_in_soup` on the rendered page, in the browser."""
+        anchors = self.browser_extractor.anchors(self.driver, do_clean)
+        return self.link_scorer.best(anchors, require=HREF)
 
-    def get_job_link_from_button(self, soup):
-        links = soup.find_all("a")
-        keywords_list = [keyword.lower() for keyword in self.keywords_list]
-        for link in links:
-            text = link.text.lower()
-            if text in keywords_list:
-                return link.get("href")
+    def get_job_link_from_button_in_browser(self, do_clean=False):
+        """`get_job_link_from_button` on the rendered page, in the browser."""
+        anchors = self.browser_extractor.anchors(self.driver, do_clean)
+        return self.link_scorer.best(anchors, require=TEXT)
 
     def get_all_job_links(self, div):
         list_of_jobs = []
@@ -242,42 +375,8 @@ class JobsScrapperCrunchbase:
         return list_of_jobs
 
     def clean_html(self, soup_obj):
-        """Clean the HTML content from unwanted tags."""
-        # Parse the HTML content using BeautifulSoup
-        # Extract only the body tag
-        body_tag = soup_obj.find("body")
-
-        tags_list = [
-            "script",
-            "img",
-            "video",
-            "audio",
-            "noscript",
-            "iframe",
-            "svg",
-            "footer",
-            "nav",
-            "header",
-        ]
-
-        for tag in tags_list:
-            # Remove script tags
-            for script in soup_obj.find_all(tag):
-                script.decompose()
-
-        # Keep only the button and text tags, but don't decompose <body>
-        for tag in soup_obj.find_all(True):
-            allowed_attrs = ["id", "class", "href"]
-            tag.attrs = {
-                key: value
-                for key, value in tag.attrs.items()
-                if key in allowed_attrs  # noqa
-            }
-
-        # Remove extra spaces using regex
-        cleaned_html = re.sub(r"\s+", " ", str(body_tag))
-
-        return BeautifulSoup(cleaned_html, "html.parser")
+        """Clean the HTML content from unwanted tags, in place."""
+        return clean_soup(soup_obj)
 
     def build_complete_link(self, link, domain="example.com"):
         if not link:
@@ -297,6 +396,14 @@ class JobsScrapperCrunchbase:
         if href_parsed.scheme and href_parsed.netloc:
             return link
 
+        # mailto:, tel: and other links that are not web pages
+        if href_parsed.scheme:
+            return None
+
+        # Protocol relative URL (e.g., //jobs.example.com/123)
+        if href_parsed.netloc:
+            return f"{base_parsed.scheme or 'https'}:{link}"
+
         # Case 2: href starts with a slash, meaning it's an absolute path
         if link.startswith("/"):
             return urlunparse(
@@ -314,143 +421,469 @@ class JobsScrapperCrunchbase:
         if link.startswith("#"):
             return f"{domain}{link}"
 
-        # Case 4: href is a relative path (e.g., vacancies)
-        return f"{domain}/{link}"
-
-    # Data Handling
-    def read_csv(self):
-        """Read input CSV."""
-        df = pd.read_csv(self.input_csv_path)
-
-        if "Career Link" not in df.columns:
-            df["Career Link"] = None
-
-        # Keep only the columns 'Company', 'Website', and 'Career Link'
-        columns_to_keep = ["Company", "Website", "Career Link"]
-        df = df[columns_to_keep]
-
-        return df
+        # Case 4: href is a relative path (e.g., vacancies), resolved
+        # against the directory of the page like a browser does
+        return urljoin(domain, link)
+
+    def canonical_job_urls(self, links, index_url):
+        """
+        Return the distinct canonical job URLs among the links of the jobs
+        index at `index_url`, without the links that cannot be job pages.
+        """
+        urls = (
+            canonical_job_url(
+                self.build_complete_link(link, domain=index_url),
+                index_url,
+            )
+            for link in links or []
+        )
+        return list(dict.fromkeys(url for url in urls if url))
+
+    def job_urls_to_visit(self, urls):
+        """Return the job URLs not visited in this run or a previous one."""
+        return [
+            url
+            for url in urls
+            if url not in self.seen_job_links and self.frontier.add(url)
+        ]
 
-    def write_csv(self, df):
-        """Write DataFrame to CSV."""
-        df.to_csv(self.input_csv_path, index=False)
+    def sync_job_listing(self, website, urls):
+        """
+        Mark the jobs of `website` no longer among the listed `urls` closed,
+        and those listed again open. Return False when the listing has not
+        changed since it was last recorded.
+        """
+        if self.seen_job_links.last_listing_digest(website) == listing_digest(urls):
+            print(f"Job listing of {website} unchanged")
+            return False
+        closed, reopened = self.seen_job_links.listing_changes(website, urls)
+        # The sink records the changes before the store does, so a killed
+        # run finds them again in the store next time rather than losing them
+        self.job_sink.set_status(website, closed, CLOSED)
+        self.job_sink.set_status(website, reopened, OPEN)
+        self.seen_job_links.apply_listing_changes(closed, reopened)
+        if closed:
+            print(f"{len(closed)} postings of {website} closed")
+        return True
 
+    # Data Handling
     def get_job_links_from_indexing_page(self, soup):
-        most_repeated_structure = find_div_structure(soup)
+        if not soup:
+            return None
+        structure_index = StructureIndex(soup)
+        most_repeated_structure = structure_index.most_repeated_fingerprint()
         if most_repeated_structure:
-            tag_list = list(most_repeated_structure)
             # Find all elements that match the target pattern
-            matching_elements = find_all_pattern_matches(soup, tag_list)
+            matching_elements = structure_index.matches(most_repeated_structure)
             if matching_elements:
                 # Extract and print the content from the
                 # 'a' tag within the matching elements
                 return extract_content_from_tag(matching_elements, "a")
 
-    def write_jobs_in_csv(self, new_row, output_csv_path):
-        """Write DataFrame to output CSV."""
-
-        # Columns for the DataFrame
-        columns = ["Website", "Job URL", "Job Title", "Job Description"]
-
-        # Check if the output CSV already exists
-        if os.path.exists(output_csv_path):
-            # If it does, read it into a DataFrame
-            df = pd.read_csv(output_csv_path)
-        else:
-            # If it doesn't, create an empty
-            # DataFrame with the specified columns
-            df = pd.DataFrame(columns=columns)
+    def get_job_links_from_indexing_page_in_browser(self, do_clean=False):
+        """`get_job_links_from_indexing_page` on the rendered page."""
+        return self.browser_extractor.repeated_structure_links(self.driver, do_clean)
 
-        # Create a DataFrame from the new row
-        new_df = pd.DataFrame([new_row], columns=columns)
+    def scrape_job_in_browser(self, do_clean=False):
+        """Return the job on the rendered job page, read in the browser."""
+        fields = self.browser_extractor.job_fields(self.driver, do_clean)
+        return self.job_extractor.from_fields(fields)
 
-        # Check if a similar row already exists in the DataFrame
-        if not df[df["Job Title"] == new_row["Job Title"]].empty:
+    def write_jobs_in_csv(self, new_row):
+        """Append a scraped job to the output, skipping duplicates."""
+        with self.instrumentation.stage(WRITE):
+            added = self.job_sink.add(new_row)
+        if not added:
             print("Row already exists. Skipping.")
-            return
-
-        # Concatenate the existing and new DataFrames
-        df = pd.concat([df, new_df], ignore_index=True)
-
-        # Save the updated DataFrame to CSV
-        df.to_csv(output_csv_path, index=False)
-
-    # Core Functionality
-    def main(self):
-        """Main execution logic."""
-        self.configure_browser()
-        df = self.read_csv()
-
-        for index, row in df.iterrows():
-            if index < 50:
-                continue
-            website_url = row["Website"]
-            career_link = row.get("Career Link", None)
-            if not career_link:
-                print(website_url)
-
-                if "https" not in website_url:
-                    website_url = website_url.replace("http", "https")
 
-                self.open_url_in_driver(website_url)
-                self.accept_cookies()
-
-                soup_obj = self.selenium_driver_obj_to_soup_obj()
-
-                career_link = self.find_career_page(website_url, soup_obj)
-                print("career_link", career_link)
-                if not career_link:
+    def flush_jobs(self):
+        """Write out the jobs buffered in the sink."""
+        with self.instrumentation.stage(WRITE):
+            self.job_sink.flush()
+
+    def scrape_ats_board(self, website, url):
+        """
+        Write every job of the ATS board `url` is on, read from its feed.
+        Return False when `url` is not on a known ATS or the feed failed.
+        """
+        connector, token = self.ats_connectors.match(url)
+        if connector is None:
+            return False
+        with self.instrumentation.stage(ATS_FEED, url=url):
+            jobs = connector.fetch_jobs(token)
+        if jobs is None:
+            return False
+        print(f"Read {len(jobs)} jobs from the ATS feed of {url}")
+        for job in jobs:
+            job["Job URL"] = canonical_url(job["Job URL"]) or job["Job URL"]
+        urls = [job["Job URL"] for job in jobs]
+        if self.sync_job_listing(website, urls):
+            for job in jobs:
+                if job["Job URL"] in self.seen_job_links:
                     continue
+                job["Website"] = website
+                self.write_jobs_in_csv(job)
+                self.seen_job_links.add(job["Job URL"], website)
+            self.seen_job_links.record_listing(website, listing_digest(urls))
+        self.flush_jobs()
+        return True
+
+    def open_outputs(self):
+        """Open the job sink and the checkpoint journal."""
+        self.job_sink = open_job_sink(self.output_csv_path)
+        self.checkpoint = CheckpointStore(self.input_csv_path)
+
+    def close_outputs(self):
+        """
+        Write out everything still buffered and close every store, once
+        the discovery probes that may still write to them have stopped.
+        """
+        self.career_discovery.shutdown(wait=True)
+        if self.job_sink is not None:
+            self.job_sink.close()
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+        self.seen_job_links.close()
+        self.negative_cache.close()
+        self.http_session.close()
+        if self.http_cache is not None:
+            self.http_cache.close()
+        self.instrumentation.close()
 
+    # Core Functionality
+    def record_career_link(self, website, career_link):
+        """Checkpoint a discovered career link."""
+        self.checkpoint.record(website, CAREER_LINK_FOUND, career_link)
+
+    def run_company(self, website, career_link=None):
+        """Process one company and checkpoint the outcome."""
+        with self.instrumentation.company(website):
+            career_link = self.process_company(
+                website,
+                career_link,
+                on_career_link=lambda link: self.record_career_link(website, link),
+            )
+        self.checkpoint.record(website, DONE if career_link else NO_CAREER_PAGE)
+
+    def process_company(self, website_url, career_link=None, on_career_link=None):
+        """Find the career page of one company and scrape its jobs."""
+        if not career_link:
+            print(website_url)
+
+            # Only the fetch uses https; jobs, seen links and listings stay
+            # keyed by the website as the accounts list it
+            homepage_url = website_url
+            if "https" not in homepage_url:
+                homepage_url = homepage_url.replace("http", "https")
+
+            page_url, career_link = self.fetch_page(
+                homepage_url,
+                self.find_career_link_in_soup,
+                HOMEPAGE,
+                accept_cookies=True,
+                extract_in_browser=self.find_career_link_in_browser,
+            )
             if career_link:
-                df.at[index, "Career Link"] = career_link
-                self.write_csv(df)
-
-                self.open_url_in_driver(career_link)
-                self.accept_cookies()
-
-                soup_obj = self.selenium_driver_obj_to_soup_obj(do_clean=True)
-
-                jobs_link = self.get_job_link_from_button(soup_obj)
-
-                if jobs_link:
-                    jobs_link = self.build_complete_link(
-                        jobs_link, domain=self.driver.current_url
-                    )
+                career_link = self.build_complete_link(
+                    career_link, domain=page_url
+                )
+            else:
+                with self.instrumentation.stage(DISCOVERY, url=homepage_url):
+                    career_link = self.career_discovery.discover(homepage_url)
+            print("career_link", career_link)
+            if not career_link:
+                return None
 
-                    self.open_url_in_driver(jobs_link)
+        if on_career_link:
+            on_career_link(career_link)
 
-                    soup_obj = self.selenium_driver_obj_to_soup_obj()
+        # Boards hosted by an ATS are read from their feed, not rendered
+        if self.scrape_ats_board(website_url, career_link):
+            return career_link
 
-                    all_jobs_links = (
-                        self.get_job_links_from_indexing_page(
-                            soup_obj,
-                        )
-                        or []
-                    )
+        page_url, jobs_link = self.fetch_page(
+            career_link,
+            self.get_job_link_from_button,
+            CAREER_PAGE,
+            do_clean=True,
+            accept_cookies=True,
+            extract_in_browser=self.get_job_link_from_button_in_browser,
+        )
+        if page_url != career_link and self.scrape_ats_board(website_url, page_url):
+            return career_link
+
+        if jobs_link:
+            jobs_link = self.build_complete_link(jobs_link, domain=page_url)
+            if self.scrape_ats_board(website_url, jobs_link):
+                return career_link
+
+            jobs_index_url, all_jobs_links = self.fetch_page(
+                jobs_link,
+                self.get_job_links_from_indexing_page,
+                JOBS_INDEX,
+                extract_in_browser=self.get_job_links_from_indexing_page_in_browser,
+            )
 
-                    for link in all_jobs_links:
-                        link = self.build_complete_link(
-                            link, domain=self.driver.current_url
-                        )
-                        print("Job link are", link)
-                        self.open_url_in_driver(link)
+            job_urls = self.canonical_job_urls(all_jobs_links, jobs_index_url)
+            # No job URL at all is more likely a failed extraction than a
+            # company that closed every posting
+            if job_urls and self.sync_job_listing(website_url, job_urls):
+                self.scrape_job_pages(website_url, job_urls)
+            self.flush_jobs()
+
+        return career_link
+
+    def scrape_job_pages(self, website_url, job_urls):
+        """
+        Scrape the job pages of a listing not visited before, then record
+        the listing as up to date. Pages no job was extracted from are
+        visited again next run, and their listing is not recorded.
+        """
+        failed = 0
+        for link in self.job_urls_to_visit(job_urls):
+            print("Job link are", link)
+
+            with self.instrumentation.stage(JOB_SCRAPING, url=link) as event:
+                _, jobs_data = self.fetch_page(
+                    link,
+                    self.job_extractor.from_soup,
+                    JOB,
+                    do_clean=True,
+                    extract_html=self.job_extractor.from_html,
+                    extract_in_browser=self.scrape_job_in_browser,
+                )
+                event["found"] = bool(jobs_data)
+            if jobs_data:
+                print("Job Personal Link is", link)
+                jobs_data["Website"] = website_url
+                jobs_data["Job URL"] = link
+                self.write_jobs_in_csv(jobs_data)
+                self.seen_job_links.add(link, website_url)
+            else:
+                # A server error or a hung render may well pass by next run
+                failed += 1
+        if failed:
+            print(f"{failed} job pages of {website_url} failed, retried next run")
+        else:
+            self.seen_job_links.record_listing(website_url, listing_digest(job_urls))
+
+    def pending_companies(self):
+        """
+        Yield (website, career link) for the companies still to process,
+        skipping those a previous run finished. In incremental mode the
+        companies whose jobs were scraped before are crawled again.
+        """
+        for account in iter_accounts(self.input_csv_path):
+            # Companies listed twice are processed once
+            if not self.frontier.add(account.website):
+                continue
+            progress = self.checkpoint.get(account.website)
+            status = progress.get("status", account.status)
+            if status in FINISHED_STATUSES and not (
+                self.incremental and status == DONE
+            ):
+                continue
+            yield account.website, progress.get("career_link", account.career_link)
+
+    def prefetch_dns(self, companies, batch_size=50):
+        """
+        Pass companies through, resolving the candidate career subdomains
+        of each batch of `batch_size` companies up front.
+        """
+        companies = iter(companies)
+        while True:
+            batch = list(itertools.islice(companies, batch_size))
+            if not batch:
+                return
+            self.career_discovery.prefetch(
+                [website for website, career_link in batch if not career_link]
+            )
+            yield from batch
 
-                        soup_obj = self.selenium_driver_obj_to_soup_obj(
-                            do_clean=True,
-                        )
+    def main(self):
+        """Main execution logic."""
+        self.configure_browser()
+        self.open_outputs()
 
-                        jobs_data = heuristic_scrape(soup_obj)
-                        if jobs_data:
-                            print("Job Personal Link is", link)
-                            jobs_data["Website"] = website_url
-                            jobs_data["Job URL"] = link
-                            self.write_jobs_in_csv(
-                                jobs_data,
-                                self.output_csv_path,
-                            )
+        try:
+            companies = self.prefetch_dns(self.pending_companies())
+            for website, career_link in companies:
+                self.run_company(website, career_link)
+        finally:
+            self.close_outputs()
 
 
 if __name__ == "__main__":
-    scrapper = JobsScrapperCrunchbase(INPUT_CSV_PATH, keywords_list)
-    scrapper.main()
+    parser = argparse.ArgumentParser(description="Scrape jobs from career pages.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="number of Firefox drivers to run in parallel",
+    )
+    parser.add_argument(
+        "--load-mode",
+        choices=MODES,
+        default="dom_stable",
+        help="what to wait for after opening a page",
+    )
+    parser.add_argument(
+        "--max-wait",
+        type=float,
+        default=10,
+        help="cap in seconds on the wait after opening a page",
+    )
+    parser.add_argument(
+        "--output",
+        default="jobs.csv",
+        help="where to write jobs; .db or .sqlite paths use SQLite",
+    )
+    parser.add_argument(
+        "--html-parser",
+        choices=available_parsers(),
+        default=default_parser(),
+        help="backend used to parse pages",
+    )
+    parser.add_argument(
+        "--http-cache",
+        default=DEFAULT_CACHE_PATH,
+        help="file caching plain HTTP responses between runs",
+    )
+    parser.add_argument(
+        "--negative-cache",
+        default=DEFAULT_NEGATIVE_CACHE_PATH,
+        help="file remembering dead career page candidates between runs",
+    )
+    parser.add_argument(
+        "--seen-links",
+        default=DEFAULT_SEEN_LINKS_PATH,
+        help="file remembering the job pages visited in previous runs",
+    )
+    parser.add_argument(
+        "--headed",
+        action="store_true",
+        help="show the browser window instead of running headless",
+    )
+    parser.add_argument(
+        "--full-browser",
+        action="store_true",
+        help="load images, media, fonts and trackers like a normal browser",
+    )
+    parser.add_argument(
+        "--page-load-timeout",
+        type=float,
+        default=DEFAULT_PAGE_LOAD_TIMEOUT,
+        help="seconds a page may take to load before loading is stopped",
+    )
+    parser.add_argument(
+        "--browser-max-pages",
+        type=int,
+        default=DEFAULT_MAX_PAGES,
+        help="pages a browser renders before it is replaced; 0 never replaces it",
+    )
+    parser.add_argument(
+        "--browser-max-memory",
+        type=int,
+        default=DEFAULT_MAX_RSS // 2**20,
+        help="MB a browser may use before it is replaced; 0 for no limit",
+    )
+    parser.add_argument(
+        "--no-browser-extraction",
+        action="store_true",
+        help="parse the page source of rendered pages in Python",
+    )
+    parser.add_argument(
+        "--events",
+        help="file to append per-stage timing events to, as JSON lines",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "crawl companies finished by previous runs again, skipping "
+            "unchanged job listings and marking vanished postings closed"
+        ),
+    )
+    parser.add_argument(
+        "--no-seen-links",
+        action="store_true",
+        help="visit every job page, even those visited in previous runs",
+    )
+    parser.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="do not cache plain HTTP responses",
+    )
+    parser.add_argument(
+        "--ats-api-base",
+        action="append",
+        default=[],
+        metavar="NAME=URL",
+        help=(
+            "read an ATS's job feeds from another API base, such as a local "
+            "fixture server; NAME is one of "
+            + ", ".join(connector.name for connector in CONNECTORS)
+        ),
+    )
+    parser.add_argument(
+        "--per-host-limit",
+        type=int,
+        default=4,
+        help="requests in flight per host at most",
+    )
+    parser.add_argument(
+        "--host-delay",
+        type=float,
+        default=0.25,
+        help="seconds between the starts of two requests to a host",
+    )
+    args = parser.parse_args()
+
+    ats_api_bases = {}
+    for option in args.ats_api_base:
+        name, _, api_base = option.partition("=")
+        if name not in {connector.name for connector in CONNECTORS} or not api_base:
+            parser.error(f"invalid --ats-api-base {option!r}")
+        ats_api_bases[name] = api_base
+
+    scrapper = JobsScrapperCrunchbase(
+        INPUT_CSV_PATH,
+        keywords_list,
+        http_cache_path=None if args.no_http_cache else args.http_cache,
+        negative_cache_path=args.negative_cache,
+        seen_links_path=None if args.no_seen_links else args.seen_links,
+        ats_api_bases=ats_api_bases,
+        events_path=args.events,
+    )
+    scrapper.output_csv_path = args.output
+    scrapper.html_parser = args.html_parser
+    scrapper.incremental = args.incremental
+    scrapper.browser_extraction = not args.no_browser_extraction
+    scrapper.headless = not args.headed
+    scrapper.lightweight_browser = not args.full_browser
+    scrapper.page_load_timeout = args.page_load_timeout
+    scrapper.browser_max_pages = args.browser_max_pages
+    scrapper.browser_max_rss = args.browser_max_memory * 2**20
+    scrapper.frontier.per_host_limit = args.per_host_limit
+    scrapper.frontier.min_delay = args.host_delay
+    scrapper.page_load = PageLoadStrategy(
+        mode=args.load_mode,
+        max_wait=args.max_wait,
+    )
+    if args.workers > 1:
+        run_worker_pool(scrapper, args.workers)
+    else:
+        scrapper.main()
+    scrapper.page_load.print_report()
+    scrapper.tier_log.print_report()
+    scrapper.driver_stats.print_report()
+    scrapper.frontier.print_report()
+    scrapper.job_extractor.print_report()
+    scrapper.browser_extractor.print_report()
+    scrapper.consent.print_report()
+    if scrapper.http_cache is not None:
+        print("HTTP cache", scrapper.http_cache.stats())
+    print("Negative cache", scrapper.negative_cache.stats())
+    scrapper.instrumentation.print_summary(
+        scrapper.seconds_to_structured_format_time
+    )
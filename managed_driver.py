@@ -0,0 +1,176 @@
+"""Firefox driver that recycles itself.
+
+A long-lived Firefox grows with every page it renders, and now and then a
+page hangs it so badly that even the page-load timeout never fires. The
+managed driver stands in for the Selenium driver: it starts Firefox on
+first use, replaces it after `max_pages` navigations or once Firefox and
+geckodriver use more than `max_rss` bytes, and kills and replaces it when
+a navigation does not return within `navigation_timeout` seconds. Callers
+keep using it like the driver itself and never see the restarts, apart
+from the hung navigation, which raises NavigationTimeout.
+"""
+import threading
+from collections import Counter
+
+from selenium.common.exceptions import WebDriverException
+
+from browser_profile import (
+    can_measure_memory,
+    driver_pid,
+    driver_rss,
+    kill_process_tree,
+)
+
+DEFAULT_MAX_PAGES = 200
+DEFAULT_MAX_RSS = 1536 * 2**20
+
+# Why a browser was replaced
+PAGES = "pages"
+MEMORY = "memory"
+HUNG = "hung"
+
+_memory_warning = threading.Event()
+
+
+class NavigationTimeout(WebDriverException):
+    """A navigation hung the browser, which was killed and replaced."""
+
+
+class DriverStats:
+    def __init__(self):
+        """Initialise the counts of browsers started and replaced."""
+        self.started = 0
+        self.restarts = Counter()
+        self._lock = threading.Lock()
+
+    def record_start(self):
+        with self._lock:
+            self.started += 1
+
+    def record_restart(self, reason):
+        with self._lock:
+            self.restarts[reason] += 1
+
+    def print_report(self):
+        """Print how many browsers were started and why they were replaced."""
+        with self._lock:
+            print(f"browser: {self.started} started")
+            for reason, count in self.restarts.items():
+                print(f"browser replaced ({reason}): {count} times")
+
+
+class ManagedDriver:
+    def __init__(
+        self,
+        factory,
+        max_pages=DEFAULT_MAX_PAGES,
+        max_rss=DEFAULT_MAX_RSS,
+        navigation_timeout=60,
+        stats=None,
+    ):
+        """
+        Initialise the driver. `factory()` starts a configured Selenium
+        driver. `max_pages` and `max_rss` may be None to never recycle on
+        that count. Recycling on memory is off, with a warning printed once,
+        where memory cannot be measured.
+        """
+        if max_rss and not can_measure_memory() and not _memory_warning.is_set():
+            _memory_warning.set()
+            print("Install psutil to recycle the browser by memory; it is off")
+        self.factory = factory
+        self.max_pages = max_pages
+        self.max_rss = max_rss
+        self.navigation_timeout = navigation_timeout
+        self.stats = stats or DriverStats()
+        self._driver = None
+        self.pages = 0
+
+    def __getattr__(self, name):
+        # Everything but navigation goes straight to the current driver
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._current(), name)
+
+    def _current(self):
+        if self._driver is None:
+            self._driver = self.factory()
+            self.pages = 0
+            self.stats.record_start()
+        return self._driver
+
+    def _recycle_due(self):
+        if self._driver is None:
+            return None
+        if self.max_pages and self.pages >= self.max_pages:
+            return PAGES
+        if self.max_rss:
+            rss = driver_rss(self._driver)
+            if rss is not None and rss > self.max_rss:
+                return MEMORY
+        return None
+
+    def recycle(self, reason):
+        """Quit the current browser; the next call starts a fresh one."""
+        self.stats.record_restart(reason)
+        self.quit()
+
+    def kill(self):
+        """Kill the current browser and its driver without asking them."""
+        if self._driver is None:
+            return
+        pid = driver_pid(self._driver)
+        if pid is not None:
+            kill_process_tree(pid)
+        self._driver = None
+
+    def quit(self):
+        """Quit the current browser, ignoring one that already crashed."""
+        if self._driver is None:
+            return
+        try:
+            self._driver.quit()
+        except Exception:
+            pass
+        self._driver = None
+
+    def _navigate(self, method, *args):
+        driver = self._current()
+        outcome = {}
+
+        def navigate():
+            try:
+                outcome["value"] = getattr(driver, method)(*args)
+            except Exception as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=navigate, daemon=True)
+        thread.start()
+        thread.join(self.navigation_timeout)
+        if thread.is_alive():
+            # Killing the processes also fails the stuck call in the thread
+            self.kill()
+            self.stats.record_restart(HUNG)
+            raise NavigationTimeout(
+                f"{method} did not return within {self.navigation_timeout}s"
+            )
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("value")
+
+    def get(self, url):
+        """Open `url`, in a fresh browser when the current one is due."""
+        reason = self._recycle_due()
+        if reason:
+            self.recycle(reason)
+        self._current()
+        self.pages += 1
+        return self._navigate("get", url)
+
+    def refresh(self):
+        return self._navigate("refresh")
+
+    def back(self):
+        return self._navigate("back")
+
+    def forward(self):
+        return self._navigate("forward")
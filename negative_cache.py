@@ -0,0 +1,169 @@
+"""Persistent cache of career-page candidates known to be dead.
+
+When a discovery probe fails for good, the failure is remembered per
+candidate URL, or per host when the whole host is unreachable (its name
+does not resolve or it refuses connections). Only a missing page, a dead
+host or a timeout is remembered; rate limiting, server errors and other
+failures are likely to pass and are retried next time. Each failure class
+expires on its own schedule, and until then discovery skips the candidate,
+or every candidate on the host, without sending a request.
+"""
+import socket
+import sqlite3
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+import requests
+
+DNS = "dns"
+REFUSED = "refused"
+NOT_FOUND = "not_found"
+TIMEOUT = "timeout"
+
+DAY = 24 * 60 * 60
+
+# How long each class of failure is trusted, in seconds
+DEFAULT_TTLS = {
+    DNS: 7 * DAY,
+    REFUSED: 3 * DAY,
+    NOT_FOUND: 14 * DAY,
+    TIMEOUT: 1 * DAY,
+}
+
+# Failures that say the whole host is dead, not just one URL on it
+HOST_FAILURES = {DNS, REFUSED}
+
+DEFAULT_NEGATIVE_CACHE_PATH = ".negative_cache.sqlite"
+
+_DNS_MESSAGES = [
+    "name or service not known",
+    "nodename nor servname",
+    "getaddrinfo failed",
+    "failed to resolve",
+    "no address associated",
+    "temporary failure in name resolution",
+]
+
+_REFUSED_MESSAGES = [
+    "connection refused",
+    "actively refused",
+]
+
+
+def _exception_chain(exception):
+    seen = set()
+    pending = [exception]
+    while pending:
+        error = pending.pop()
+        if error is None or id(error) in seen:
+            continue
+        seen.add(id(error))
+        yield error
+        # urllib3 keeps the underlying error on `reason`, requests in `args`
+        reason = getattr(error, "reason", None)
+        if isinstance(reason, BaseException):
+            pending.append(reason)
+        pending += [arg for arg in error.args if isinstance(arg, BaseException)]
+        pending += [error.__cause__, error.__context__]
+
+
+def classify_exception(exception):
+    """
+    Return the failure class of a request exception, or None when it is
+    not worth remembering.
+    """
+    if isinstance(exception, requests.Timeout):
+        return TIMEOUT
+    for error in _exception_chain(exception):
+        if isinstance(error, socket.gaierror):
+            return DNS
+        if isinstance(error, ConnectionRefusedError):
+            return REFUSED
+    message = str(exception).lower()
+    if any(part in message for part in _DNS_MESSAGES):
+        return DNS
+    if any(part in message for part in _REFUSED_MESSAGES):
+        return REFUSED
+    return None
+
+
+def classify_status(status_code):
+    """
+    Return the failure class of an HTTP status, or None for success and
+    for errors that are likely to pass, like 429 and 5xx.
+    """
+    if status_code in (404, 410):
+        return NOT_FOUND
+    return None
+
+
+def _host_key(url):
+    return "host:" + urlparse(url).netloc.lower()
+
+
+class NegativeCache:
+    def __init__(self, path=DEFAULT_NEGATIVE_CACHE_PATH, ttls=None):
+        """Open the cache file, creating it if needed."""
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.hits = Counter()
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS failures (
+                    target TEXT PRIMARY KEY,
+                    failure TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            self.connection.execute(
+                "DELETE FROM failures WHERE expires_at < ?",
+                (time.time(),),
+            )
+
+    def failure(self, url):
+        """
+        Return the unexpired failure class recorded for the URL or its
+        host, or None, and count the lookup as a hit or a miss.
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT failure FROM failures "
+                "WHERE target IN (?, ?) AND expires_at >= ? LIMIT 1",
+                (_host_key(url), url, time.time()),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits[row[0]] += 1
+            return row[0]
+
+    def record(self, url, failure):
+        """Remember that probing `url` failed with the given class."""
+        target = _host_key(url) if failure in HOST_FAILURES else url
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO failures VALUES (?, ?, ?)",
+                (target, failure, time.time() + self.ttls[failure]),
+            )
+
+    def stats(self):
+        """Return the hits per failure class, the misses and the hit rate."""
+        hits = sum(self.hits.values())
+        lookups = hits + self.misses
+        return {
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        """Close the cache file."""
+        with self._lock:
+            self.connection.close()
@@ -0,0 +1,160 @@
+"""Readiness-based page loading for the selenium driver.
+
+Instead of sleeping for a fixed time after every navigation, wait until the
+page is actually ready: the document has finished loading, or only parsing
+with the eager page-load strategy, and, depending on the mode, the network
+or the DOM has gone quiet. Every wait is capped and the time actually
+spent is totalled per stage, and can be added to the event of the page.
+"""
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+READY = "ready"
+NETWORK_IDLE = "network_idle"
+DOM_STABLE = "dom_stable"
+MODES = [READY, NETWORK_IDLE, DOM_STABLE]
+
+# The fixed sleeps the scrapper used before, per stage, in seconds
+FIXED_SLEEPS = {
+    "navigation": 3,
+    "cookies": 7,
+}
+
+# The document states a page counts as loaded in
+LOADED_STATES = ("complete",)
+EAGER_LOADED_STATES = ("interactive", "complete")
+
+_PROBES = {
+    NETWORK_IDLE: "return performance.getEntriesByType('resource').length;",
+    DOM_STABLE: "return document.getElementsByTagName('*').length;",
+}
+
+
+class _QuietFor:
+    """Wait condition: the page is loaded and a probe value stopped changing."""
+
+    def __init__(self, script, quiet_period, loaded_states=LOADED_STATES):
+        self.script = script
+        self.quiet_period = quiet_period
+        self.loaded_states = loaded_states
+        self.last_value = None
+        self.changed_at = time.perf_counter()
+
+    def __call__(self, driver):
+        ready_state = driver.execute_script("return document.readyState;")
+        if ready_state not in self.loaded_states:
+            return False
+        if self.script is None:
+            return True
+
+        value = driver.execute_script(self.script)
+        now = time.perf_counter()
+        if value != self.last_value:
+            self.last_value = value
+            self.changed_at = now
+            return False
+        return now - self.changed_at >= self.quiet_period
+
+
+class PageLoadStrategy:
+    def __init__(
+        self,
+        mode=DOM_STABLE,
+        max_wait=10,
+        quiet_period=0.5,
+        poll_interval=0.1,
+        eager=False,
+    ):
+        """
+        Initialise the strategy.
+
+        `mode` is one of "ready", "network_idle" or "dom_stable". `max_wait`
+        caps the wait after a navigation; the wait for a cookie banner is
+        capped by the consent handler. With `eager`, as for a browser using
+        the eager page-load strategy, a parsed document counts as loaded
+        without waiting for its subresources.
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown page load mode {mode!r}")
+        self.mode = mode
+        self.max_wait = max_wait
+        self.quiet_period = quiet_period
+        self.poll_interval = poll_interval
+        self.eager = eager
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, url, stage, seconds, timed_out=False):
+        """Count the time spent waiting on a page."""
+        with self._lock:
+            totals = self.stages.setdefault(
+                stage,
+                {"waits": 0, "seconds": 0.0, "timeouts": 0},
+            )
+            totals["waits"] += 1
+            totals["seconds"] += seconds
+            totals["timeouts"] += timed_out
+
+    def wait_until(
+        self, driver, condition, timeout, url=None, stage=None, event=None
+    ):
+        """
+        Wait until `condition(driver)` is truthy or `timeout` runs out.
+        Return the condition's value, or None on timeout. The wait is
+        counted when a stage is given, and added to the `event` fields of
+        the page when they are.
+        """
+        started = time.perf_counter()
+        result = None
+        timed_out = False
+        try:
+            result = WebDriverWait(
+                driver,
+                timeout,
+                poll_frequency=self.poll_interval,
+            ).until(condition)
+        except TimeoutException:
+            timed_out = True
+        except WebDriverException:
+            pass
+        seconds = time.perf_counter() - started
+        if stage:
+            self.record(url, stage, seconds, timed_out)
+        if event is not None:
+            event["wait_seconds"] = round(seconds, 6)
+            event["wait_timed_out"] = timed_out
+        return result
+
+    def wait_for_page(self, driver, url=None, stage=None, event=None):
+        """Wait until the current page is ready according to the mode."""
+        condition = _QuietFor(
+            _PROBES.get(self.mode),
+            self.quiet_period,
+            EAGER_LOADED_STATES if self.eager else LOADED_STATES,
+        )
+        return self.wait_until(
+            driver, condition, self.max_wait, url, stage, event
+        )
+
+    def report(self):
+        """Summarise the time spent waiting, per stage."""
+        with self._lock:
+            stages = {name: dict(totals) for name, totals in self.stages.items()}
+        for name, stage in stages.items():
+            fixed = FIXED_SLEEPS.get(name, 0) * stage["waits"]
+            stage["fixed_sleep_seconds"] = fixed
+            stage["saved_seconds"] = fixed - stage["seconds"]
+        return stages
+
+    def print_report(self):
+        """Print the waiting report."""
+        for name, stage in self.report().items():
+            print(
+                f"{name}: {stage['waits']} waits, "
+                f"{stage['seconds']:.1f}s waited, "
+                f"{stage['timeouts']} timed out, "
+                f"{stage['saved_seconds']:.1f}s saved vs fixed sleeps"
+            )
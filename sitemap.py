@@ -0,0 +1,126 @@
+"""Streaming sitemap reader.
+
+Sitemaps are parsed incrementally as they download, gzipped or not, and
+the download stops at the first URL that matches. Sitemap indexes are
+followed into their nested sitemaps, the job related looking ones first,
+within a depth and count budget.
+"""
+import re
+import xml.etree.ElementTree as ET
+import zlib
+from collections import deque
+
+import requests
+
+CHUNK_SIZE = 64 * 1024
+
+# Sitemaps are capped at 50 MB uncompressed by the protocol
+MAX_SITEMAP_BYTES = 50 * 2**20
+
+ROBOTS_SITEMAP = re.compile(
+    r"^\s*sitemap\s*:\s*(\S+)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def read_robots_sitemaps(robots_txt):
+    """Return the sitemap URLs listed in a robots.txt."""
+    return list(dict.fromkeys(ROBOTS_SITEMAP.findall(robots_txt)))
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_locs(response, should_stop=None, max_bytes=MAX_SITEMAP_BYTES):
+    """
+    Yield (kind, loc) for every <loc> of a streamed sitemap response, where
+    kind is "sitemap" for the entries of a sitemap index and "url" for
+    pages. Parsing stops early when `should_stop()` returns True.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    decompressor = None
+    is_index = None
+    size = 0
+
+    for position, chunk in enumerate(response.iter_content(CHUNK_SIZE)):
+        if should_stop is not None and should_stop():
+            return
+        if position == 0 and chunk[:2] == b"\x1f\x8b":
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk, max_bytes - size)
+        size += len(chunk)
+
+        try:
+            parser.feed(chunk)
+            events = list(parser.read_events())
+        except ET.ParseError:
+            return
+
+        for event, element in events:
+            name = _local_name(element.tag)
+            if event == "start":
+                if is_index is None:
+                    is_index = name == "sitemapindex"
+                continue
+            if name == "loc":
+                kind = "sitemap" if is_index else "url"
+                yield kind, (element.text or "").strip()
+            elif name in ("url", "sitemap"):
+                # Drop finished entries so memory stays flat
+                element.clear()
+
+        if size >= max_bytes:
+            return
+
+
+def find_in_sitemap(
+    session,
+    response,
+    keywords,
+    headers=None,
+    timeout=10,
+    should_stop=None,
+    max_depth=2,
+    max_sitemaps=20,
+):
+    """
+    Stream the sitemap in `response`, following nested sitemap indexes,
+    and return the first page URL containing one of `keywords`, or None.
+    """
+    pending = deque([(response, 0)])
+    fetched = 1
+    while pending:
+        response, depth = pending.popleft()
+        if isinstance(response, str):
+            try:
+                response = session.get(
+                    response,
+                    headers=headers,
+                    timeout=timeout,
+                    stream=True,
+                )
+            except requests.RequestException:
+                continue
+            if response.status_code != 200:
+                response.close()
+                continue
+
+        nested = []
+        with response:
+            for kind, loc in iter_locs(response, should_stop):
+                if kind == "url":
+                    if any(keyword in loc for keyword in keywords):
+                        return loc
+                elif depth < max_depth:
+                    nested.append(loc)
+
+        # Visit the nested sitemaps that look job related first
+        nested.sort(
+            key=lambda loc: not any(keyword in loc for keyword in keywords)
+        )
+        for loc in nested[: max_sitemaps - fetched]:
+            pending.append((loc, depth + 1))
+            fetched += 1
+    return None
@@ -0,0 +1,247 @@
+"""Tests of the ATS connectors against a local fixture server.
+
+Every connector's API base is pointed at an `http.server` serving canned
+feeds, the way `--ats-api-base` does for a run. Run from the repository
+root:
+
+    python -m pytest tests
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ats_connectors import AtsConnectors  # noqa: E402
+
+# Request path: (status, body) served by the fixture server
+FEEDS = {
+    "/greenhouse/v1/boards/acme/jobs?content=true": (
+        200,
+        {
+            "jobs": [
+                {
+                    "absolute_url": "https://boards.greenhouse.io/acme/jobs/1",
+                    "title": "Backend Engineer",
+                    "content": "&lt;p&gt;Build &lt;b&gt;APIs&lt;/b&gt;&lt;/p&gt;",
+                },
+                {"absolute_url": None, "title": "No URL", "content": ""},
+            ]
+        },
+    ),
+    "/lever/v0/postings/acme?mode=json": (
+        200,
+        [
+            {
+                "hostedUrl": "https://jobs.lever.co/acme/abc",
+                "text": "Data Analyst",
+                "descriptionPlain": "Analyse data.",
+                "lists": [{"text": "You will", "content": "<li>Report</li>"}],
+                "additionalPlain": "Remote.",
+            }
+        ],
+    ),
+    "/workable/api/v1/widget/accounts/acme?details=true": (
+        200,
+        {
+            "jobs": [
+                {
+                    "url": "https://apply.workable.com/j/ABC123",
+                    "title": "Designer",
+                    "description": "<p>Design things</p>",
+                }
+            ]
+        },
+    ),
+    "/ashby/posting-api/job-board/acme": (
+        200,
+        {
+            "jobs": [
+                {
+                    "jobUrl": "https://jobs.ashbyhq.com/acme/1",
+                    "title": "Recruiter",
+                    "descriptionPlain": "Hire people.",
+                },
+                {
+                    "jobUrl": "https://jobs.ashbyhq.com/acme/2",
+                    "title": "Unlisted",
+                    "descriptionPlain": "Hidden.",
+                    "isListed": False,
+                },
+            ]
+        },
+    ),
+    "/recruitee/acme/api/offers/": (
+        200,
+        {
+            "offers": [
+                {
+                    "careers_url": "https://acme.recruitee.com/o/support",
+                    "title": "Support Agent",
+                    "description": "<p>Help customers.</p>",
+                    "requirements": "<p>Patience.</p>",
+                }
+            ]
+        },
+    ),
+    "/greenhouse/v1/boards/gone/jobs?content=true": (404, {"error": "not found"}),
+    "/lever/v0/postings/busy?mode=json": (503, {"error": "unavailable"}),
+    "/ashby/posting-api/job-board/broken": (200, "not json"),
+}
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        status, body = FEEDS.get(self.path, (404, {}))
+        payload = body if isinstance(body, str) else json.dumps(body)
+        payload = payload.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def unused_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+class AtsConnectorsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+        cls.server.requests = []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{cls.server.server_port}"
+        cls.session = requests.Session()
+        cls.connectors = AtsConnectors(
+            cls.session,
+            {
+                "greenhouse": f"{base}/greenhouse",
+                "lever": f"{base}/lever",
+                "workable": f"{base}/workable",
+                "ashby": f"{base}/ashby",
+                "recruitee": f"{base}/recruitee/{{token}}",
+            },
+            timeout=5,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.session.close()
+
+    def setUp(self):
+        self.server.requests.clear()
+
+    def test_greenhouse_board(self):
+        jobs = self.connectors.fetch_jobs("https://boards.greenhouse.io/acme")
+        self.assertEqual(
+            jobs,
+            [
+                {
+                    "Job URL": "https://boards.greenhouse.io/acme/jobs/1",
+                    "Job Title": "Backend Engineer",
+                    "Job Description": "Build APIs",
+                }
+            ],
+        )
+
+    def test_greenhouse_embedded_board(self):
+        jobs = self.connectors.fetch_jobs(
+            "https://boards.greenhouse.io/embed/job_board?for=acme"
+        )
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(
+            self.server.requests, ["/greenhouse/v1/boards/acme/jobs?content=true"]
+        )
+
+    def test_lever_board(self):
+        jobs = self.connectors.fetch_jobs("https://jobs.lever.co/acme/abc")
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs[0]["Job URL"], "https://jobs.lever.co/acme/abc")
+        self.assertEqual(jobs[0]["Job Title"], "Data Analyst")
+        self.assertEqual(
+            jobs[0]["Job Description"], "Analyse data. You will Report Remote."
+        )
+
+    def test_workable_board_urls(self):
+        for url in (
+            "https://apply.workable.com/acme/",
+            "https://acme.workable.com/",
+        ):
+            with self.subTest(url=url):
+                jobs = self.connectors.fetch_jobs(url)
+                self.assertEqual(
+                    [job["Job Title"] for job in jobs], ["Designer"]
+                )
+
+    def test_workable_job_link_is_not_a_board(self):
+        connector, token = self.connectors.match(
+            "https://apply.workable.com/j/ABC123"
+        )
+        self.assertIsNone(connector)
+        self.assertIsNone(
+            self.connectors.fetch_jobs("https://apply.workable.com/j/ABC123")
+        )
+        self.assertEqual(self.server.requests, [])
+
+    def test_ashby_skips_unlisted_jobs(self):
+        jobs = self.connectors.fetch_jobs("https://jobs.ashbyhq.com/acme")
+        self.assertEqual([job["Job Title"] for job in jobs], ["Recruiter"])
+
+    def test_recruitee_subdomain(self):
+        connector, token = self.connectors.match("https://acme.recruitee.com/o/x")
+        self.assertEqual((connector.name, token), ("recruitee", "acme"))
+        jobs = self.connectors.fetch_jobs("https://acme.recruitee.com/")
+        self.assertEqual(
+            jobs,
+            [
+                {
+                    "Job URL": "https://acme.recruitee.com/o/support",
+                    "Job Title": "Support Agent",
+                    "Job Description": "Help customers. Patience.",
+                }
+            ],
+        )
+
+    def test_unknown_host(self):
+        self.assertIsNone(self.connectors.fetch_jobs("https://example.com/careers"))
+        self.assertIsNone(self.connectors.fetch_jobs(None))
+        self.assertEqual(self.server.requests, [])
+
+    def test_non_200_feeds(self):
+        for url in (
+            "https://boards.greenhouse.io/gone",
+            "https://jobs.lever.co/busy",
+        ):
+            with self.subTest(url=url):
+                self.assertIsNone(self.connectors.fetch_jobs(url))
+
+    def test_invalid_json_feed(self):
+        self.assertIsNone(self.connectors.fetch_jobs("https://jobs.ashbyhq.com/broken"))
+
+    def test_unreachable_feed(self):
+        connectors = AtsConnectors(
+            self.session,
+            {"greenhouse": f"http://127.0.0.1:{unused_port()}"},
+            timeout=5,
+        )
+        self.assertIsNone(connectors.fetch_jobs("https://boards.greenhouse.io/acme"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""HTTP-first page fetching.
+
+Most career pages, job indexes and job pages are plain server-rendered HTML
+that a pooled requests session can fetch in a fraction of the time a full
+browser render takes. The HTTP tier serves a page when its HTML looks
+complete, and the scrapper falls back to the browser otherwise. Every fetch
+counts which tier served it and why the HTTP tier was passed over, so the
+heuristic can be tuned.
+"""
+import threading
+from collections import Counter
+
+import requests
+
+from http_cache import build_session
+
+HTTP_TIER = "http"
+BROWSER_TIER = "browser"
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) "
+        "Gecko/20100101 Firefox/128.0"
+    ),
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+}
+
+# Elements single-page apps mount into; empty in the server HTML
+SPA_ROOT_IDS = ["root", "app", "__next", "__nuxt", "___gatsby", "svelte"]
+
+NOSCRIPT_PHRASES = [
+    "enable javascript",
+    "javascript is disabled",
+    "requires javascript",
+    "javascript to run this app",
+]
+
+# Pages with fewer words of visible text than this are treated as shells
+MIN_BODY_WORDS = 30
+
+
+def looks_js_rendered(soup):
+    """Return the reason the page looks JS-rendered, or None if it does not."""
+    body = soup.find("body")
+    if body is None:
+        return "no_body"
+
+    for noscript in body.find_all("noscript"):
+        text = noscript.get_text(" ").lower()
+        if any(phrase in text for phrase in NOSCRIPT_PHRASES):
+            return "noscript"
+
+    for root_id in SPA_ROOT_IDS:
+        root = body.find(id=root_id)
+        if root is not None and root.find(True) is None:
+            return "spa_root"
+
+    if len(body.get_text(" ").split()) < MIN_BODY_WORDS:
+        return "little_text"
+
+    return None
+
+
+class HttpFetcher:
+    def __init__(self, timeout=10, headers=None, pool_size=32, session=None):
+        """Initialise the fetcher with a pooled session."""
+        self.timeout = timeout
+        self.headers = headers or HEADERS
+        self.session = session or build_session(pool_size=pool_size)
+
+    def get(self, url):
+        """Return the response for an HTML page, or None."""
+        try:
+            response = self.session.get(
+                url,
+                headers=self.headers,
+                timeout=self.timeout,
+            )
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        if "html" not in response.headers.get("Content-Type", ""):
+            return None
+        return response
+
+
+class TierLog:
+    def __init__(self):
+        """Initialise empty counts of which tier served the pages."""
+        self.tiers = Counter()
+        self.fallback_reasons = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, url, tier, reason=None):
+        """
+        Count the tier that served `url`. For browser fetches `reason` says
+        why the HTTP tier was not used.
+        """
+        with self._lock:
+            self.tiers[tier] += 1
+            if reason:
+                self.fallback_reasons[reason] += 1
+
+    def report(self):
+        """Count fetches per tier and browser fallbacks per reason."""
+        with self._lock:
+            return {
+                "tiers": Counter(self.tiers),
+                "fallback_reasons": Counter(self.fallback_reasons),
+            }
+
+    def print_report(self):
+        """Print the tier report."""
+        report = self.report()
+        for tier, count in report["tiers"].items():
+            print(f"{tier} tier: {count} pages")
+        for reason, count in report["fallback_reasons"].items():
+            print(f"browser fallback ({reason}): {count} pages")
@@ -1,27 +1,123 @@
 from bs4 import Tag
-from collections import Counter
+
+# Structural fingerprints are polynomial hashes of a tag's pattern, so the
+# fingerprint of a tag can be combined from the fingerprints of its children
+_MODULUS = (1 << 61) - 1
+_BASE = 1_000_003
 
 
 def get_tag_pattern(element):
     if isinstance(element, Tag):
-        return [element.name] + sum(
-            [get_tag_pattern(child) for child in element.children], []
-        )
+        return [element.name] + [
+            tag.name for tag in element.descendants if isinstance(tag, Tag)
+        ]
     else:
         return []
 
 
+class StructureIndex:
+    """
+    Structural fingerprint of every tag in a soup, computed in a single
+    bottom-up pass. Two tags share a fingerprint when they share the
+    pattern returned by `get_tag_pattern`.
+    """
+
+    def __init__(self, soup):
+        self._powers = [1]
+        self._name_hashes = {}
+        self.fingerprints = {}
+        self.contains_anchor = {}
+        self.divs_by_fingerprint = {}
+        self._index(soup)
+
+    def _power(self, exponent):
+        while len(self._powers) <= exponent:
+            self._powers.append(self._powers[-1] * _BASE % _MODULUS)
+        return self._powers[exponent]
+
+    def _name_hash(self, name):
+        name_hash = self._name_hashes.get(name)
+        if name_hash is None:
+            name_hash = hash(name) % _MODULUS
+            self._name_hashes[name] = name_hash
+        return name_hash
+
+    def _combine(self, fingerprint, other):
+        value, length = fingerprint
+        other_value, other_length = other
+        value = (value * self._power(other_length) + other_value) % _MODULUS
+        return value, length + other_length
+
+    def pattern_fingerprint(self, pattern):
+        """Return the fingerprint of a pattern from `get_tag_pattern`."""
+        value = 0
+        for name in pattern:
+            value = (value * _BASE + self._name_hash(name)) % _MODULUS
+        return value, len(pattern)
+
+    def _index(self, soup):
+        # Divs are collected in document order, the children of a tag are
+        # fingerprinted before the tag itself
+        divs = []
+        stack = [(soup, False)]
+        while stack:
+            element, children_done = stack.pop()
+            if not children_done:
+                if element.name == "div":
+                    divs.append(element)
+                stack.append((element, True))
+                children = [
+                    child for child in element.children if isinstance(child, Tag)
+                ]
+                stack.extend((child, False) for child in reversed(children))
+                continue
+
+            fingerprint = (self._name_hash(element.name), 1)
+            contains_anchor = False
+            for child in element.children:
+                if isinstance(child, Tag):
+                    fingerprint = self._combine(
+                        fingerprint, self.fingerprints[id(child)]
+                    )
+                    contains_anchor = (
+                        contains_anchor
+                        or child.name == "a"
+                        or self.contains_anchor[id(child)]
+                    )
+            self.fingerprints[id(element)] = fingerprint
+            self.contains_anchor[id(element)] = contains_anchor
+
+        for div in divs:
+            self.divs_by_fingerprint.setdefault(
+                self.fingerprints[id(div)], []
+            ).append(div)
+
+    def most_repeated_fingerprint(self):
+        """
+        Return the fingerprint shared by the most divs containing a link,
+        or None. Ties go to the structure that appears first.
+        """
+        counts = {
+            fingerprint: sum(self.contains_anchor[id(div)] for div in divs)
+            for fingerprint, divs in self.divs_by_fingerprint.items()
+        }
+        counts = {key: count for key, count in counts.items() if count}
+        if not counts:
+            return None
+        return max(counts, key=counts.get)
+
+    def matches(self, fingerprint):
+        """Return the divs with the given fingerprint, in document order."""
+        return self.divs_by_fingerprint.get(fingerprint, [])
+
+
 def find_all_pattern_matches(soup, target_pattern):
     if not soup:
         print("Soup object is None.")
         return []
 
-    matching_elements = []
-    for div in soup.find_all("div"):
-        current_pattern = get_tag_pattern(div)
-        if current_pattern == target_pattern:
-            matching_elements.append(div)
-    return matching_elements
+    index = StructureIndex(soup)
+    return list(index.matches(index.pattern_fingerprint(target_pattern)))
 
 
 def extract_content_from_tag(elements, tag_name):
@@ -39,17 +135,8 @@ def find_div_structure(soup):
         print("Soup object is None.")
         return None
 
-    div_structure_count = Counter()
-
-    for div in soup.find_all("div"):
-        if div.find("a"):
-            div_structure = get_tag_pattern(div)
-            div_structure_count[tuple(div_structure)] += 1
-
-    if div_structure_count:
-        most_repeated_div_structure = max(
-            div_structure_count, key=div_structure_count.get
-        )
-        return most_repeated_div_structure
-    else:
+    index = StructureIndex(soup)
+    fingerprint = index.most_repeated_fingerprint()
+    if fingerprint is None:
         return None
+    return tuple(get_tag_pattern(index.matches(fingerprint)[0]))
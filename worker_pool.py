@@ -0,0 +1,70 @@
+"""Run the scrapper over many companies with a pool of Firefox drivers.
+
+Each worker owns one Firefox driver and takes companies from a shared,
+bounded queue fed straight from the accounts CSV. A worker whose
+driver crashes starts a fresh one and retries the company.
+"""
+import queue
+import threading
+
+from selenium.common.exceptions import WebDriverException
+
+from checkpoint import FAILED
+
+
+def _run_with_retries(scrapper, website, career_link, max_attempts):
+    for attempt in range(max_attempts):
+        try:
+            scrapper.run_company(website, career_link)
+            return
+        except WebDriverException as e:
+            print(f"Driver crashed on {website}: {e}")
+            scrapper.restart_browser()
+        except Exception as e:
+            print(f"Failed to process {website}: {e}")
+            break
+    scrapper.checkpoint.record(website, FAILED)
+
+
+def _worker(scrapper, tasks, max_attempts):
+    scrapper.configure_browser()
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            website, career_link = task
+            _run_with_retries(scrapper, website, career_link, max_attempts)
+    finally:
+        scrapper.quit_browser()
+
+
+def run_worker_pool(scrapper, workers, max_attempts=3):
+    """
+    Process every pending company of `scrapper` with `workers` browsers.
+
+    Progress is checkpointed and jobs are written to the scrapper's
+    output exactly as in the sequential run.
+    """
+    scrapper.open_outputs()
+    tasks = queue.Queue(maxsize=workers * 4)
+
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(scrapper.clone_for_worker(), tasks, max_attempts),
+            name=f"scrapper-worker-{number}",
+        )
+        for number in range(workers)
+    ]
+    try:
+        for thread in threads:
+            thread.start()
+        for task in scrapper.prefetch_dns(scrapper.pending_companies()):
+            tasks.put(task)
+    finally:
+        for _ in threads:
+            tasks.put(None)
+        for thread in threads:
+            thread.join()
+        scrapper.close_outputs()